@@ -1,7 +1,12 @@
 """Production scheduling backend with Flask."""
 
+import hashlib
 import json
+import multiprocessing
 import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from flask import Flask, jsonify, request
 from flask_cors import CORS
@@ -11,67 +16,230 @@ CORS(app)
 
 # Persist orders in a local JSON file.
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ORDERS_FILE = os.path.join(BASE_DIR, "orders.json")
-ATTENDANCE_FILE = os.path.join(BASE_DIR, "attendance.json")
+DATA_DIR = os.environ.get("DATA_DIR", BASE_DIR)
+ORDERS_FILE = os.path.join(DATA_DIR, "orders.json")
+ATTENDANCE_FILE = os.path.join(DATA_DIR, "attendance.json")
+DELETED_ORDERS_FILE = os.path.join(DATA_DIR, "deleted_orders.json")
+ROUTINGS_FILE = os.path.join(BASE_DIR, "routings.json")
+MIN_ORDER_QUANTITY = 3
+MAX_ORDER_QUANTITY = 50
+WORK_HOURS_PER_DAY = 7
+
+# One compiled scheduling step: resource binding plus precomputed duration.
+StagePlan = namedtuple("StagePlan", ["name", "machine", "worker_type", "team", "days", "hours"])
+
+
+def load_routing_config():
+    """Load process definitions and per-cabinet-type routings from JSON file."""
+    with open(ROUTINGS_FILE, "r", encoding="utf-8-sig") as f:
+        return json.load(f)
+
+
+def compile_stage_plan(steps, quantity, process_catalog):
+    """Resolve routing steps into stage plans for a given order quantity."""
+    plan = []
+    for step in steps:
+        process = process_catalog[step["process"]]
+        hours_needed = step["hours_per_cabinet"] * quantity
+        team = tuple((member["role"], member["count"]) for member in process.get("team", []))
+        plan.append(StagePlan(
+            name=process["name"],
+            machine=process.get("machine"),
+            worker_type=process["worker_type"],
+            team=team,
+            days=max(1, int(hours_needed / WORK_HOURS_PER_DAY)),
+            hours=hours_needed
+        ))
+    return tuple(plan)
+
+
+def compile_duration_tables(config, max_quantity):
+    """Precompute stage plans for every (routing, quantity) pair."""
+    process_catalog = {process["name"]: process for process in config["processes"]}
+    routings = config["routings"]
+    if "default" not in routings:
+        raise ValueError("Routing config must define a 'default' routing.")
+
+    order_index = {name: index for index, name in enumerate(process_catalog)}
+    for routing_name, steps in routings.items():
+        names = [step.get("process") for step in steps]
+        unknown = [name for name in names if name not in process_catalog]
+        if unknown:
+            raise ValueError(f"Routing '{routing_name}' uses unknown processes: {', '.join(unknown)}.")
+        if names != sorted(names, key=order_index.get):
+            raise ValueError(f"Routing '{routing_name}' must follow the process order.")
+
+    return {
+        (routing_name, quantity): compile_stage_plan(steps, quantity, process_catalog)
+        for routing_name, steps in routings.items()
+        for quantity in range(1, max_quantity + 1)
+    }
+
+
+ROUTING_CONFIG = load_routing_config()
 PROCESS_FLOW = [
-    {"name": "CNC Cutting", "ratio": 15},
-    {"name": "CNC Edging", "ratio": 15},
-    {"name": "CNC Routing", "ratio": 15},
-    {"name": "Assembly", "ratio": 40},
-    {"name": "Quality Assurance", "ratio": 5},
-    {"name": "Packing", "ratio": 10},
+    {"name": process["name"], "ratio": process["ratio"]}
+    for process in ROUTING_CONFIG["processes"]
 ]
 PROCESS_NAMES = [process["name"] for process in PROCESS_FLOW]
 PROCESS_RATIO_MAP = {process["name"]: process["ratio"] for process in PROCESS_FLOW}
+PROCESS_CATALOG = {process["name"]: process for process in ROUTING_CONFIG["processes"]}
+ROUTING_KEYS = {name.strip().lower(): name for name in ROUTING_CONFIG["routings"]}
+# Processes a routing does not use count as already done for progress tracking.
+ROUTING_SKIPPED_PROCESSES = {
+    name: frozenset(PROCESS_NAMES) - {step["process"] for step in steps}
+    for name, steps in ROUTING_CONFIG["routings"].items()
+}
+STAGE_DURATION_TABLE = compile_duration_tables(ROUTING_CONFIG, MAX_ORDER_QUANTITY)
 RESOURCE_CATALOG = [
-    {"id": "MO1", "role": "Machine Operator"},
-    {"id": "MO2", "role": "Machine Operator"},
-    {"id": "MO3", "role": "Machine Operator"},
-    {"id": "C1", "role": "Carpenter"},
-    {"id": "C2", "role": "Carpenter"},
-    {"id": "C3", "role": "Carpenter"},
-    {"id": "C4", "role": "Carpenter"},
-    {"id": "C5", "role": "Carpenter"},
-    {"id": "C6", "role": "Carpenter"},
-    {"id": "NSH1", "role": "Non-Skilled Helper"},
-    {"id": "NSH2", "role": "Non-Skilled Helper"},
-    {"id": "NSH3", "role": "Non-Skilled Helper"},
-    {"id": "NSH4", "role": "Non-Skilled Helper"},
-    {"id": "NSH5", "role": "Non-Skilled Helper"},
-    {"id": "NSH6", "role": "Non-Skilled Helper"},
-    {"id": "NSH7", "role": "Non-Skilled Helper"},
-    {"id": "NSH8", "role": "Non-Skilled Helper"},
+    {"id": "MO1", "role": "Machine Operator", "line": "L1", "machine": "MO1"},
+    {"id": "MO2", "role": "Machine Operator", "line": "L1", "machine": "MO2"},
+    {"id": "MO3", "role": "Machine Operator", "line": "L1", "machine": "MO3"},
+    {"id": "C1", "role": "Carpenter", "line": "L1"},
+    {"id": "C2", "role": "Carpenter", "line": "L1"},
+    {"id": "C3", "role": "Carpenter", "line": "L1"},
+    {"id": "C4", "role": "Carpenter", "line": "L1"},
+    {"id": "C5", "role": "Carpenter", "line": "L1"},
+    {"id": "C6", "role": "Carpenter", "line": "L1"},
+    {"id": "NSH1", "role": "Non-Skilled Helper", "line": "L1"},
+    {"id": "NSH2", "role": "Non-Skilled Helper", "line": "L1"},
+    {"id": "NSH3", "role": "Non-Skilled Helper", "line": "L1"},
+    {"id": "NSH4", "role": "Non-Skilled Helper", "line": "L1"},
+    {"id": "NSH5", "role": "Non-Skilled Helper", "line": "L1"},
+    {"id": "NSH6", "role": "Non-Skilled Helper", "line": "L1"},
+    {"id": "NSH7", "role": "Non-Skilled Helper", "line": "L1"},
+    {"id": "NSH8", "role": "Non-Skilled Helper", "line": "L1"},
 ]
 RESOURCE_ROLE_MAP = {entry["id"]: entry["role"] for entry in RESOURCE_CATALOG}
+# Each production line schedules against its own resources. Operators name the
+# routing machine they run; IDs must stay unique across lines (e.g. "L2-MO1").
+DEFAULT_LINE = "L1"
+PRODUCTION_LINES = sorted({entry.get("line", DEFAULT_LINE) for entry in RESOURCE_CATALOG})
+# Below this many orders, process start-up costs more than it saves.
+PARALLEL_MIN_ORDERS = 200
+# Async serving sets this so large single-line schedules do not hold the request threads' GIL.
+SCHEDULE_IN_PROCESS = False
+SCHEDULE_WORKERS = int(os.environ.get("SCHEDULE_WORKERS", os.cpu_count() or 1))
+_shard_executor = None
+_shard_executor_lock = threading.Lock()
+
+# Raw JSON text per data file, reused while the file on disk is unchanged.
+_file_cache = {}
+# Held across every load -> modify -> save so concurrent requests cannot lose writes.
+_storage_lock = threading.RLock()
+
+
+def resolve_routing(cabinet_type):
+    """Map a cabinet type to its routing name, falling back to the default routing."""
+    return ROUTING_KEYS.get(str(cabinet_type or "").strip().lower(), "default")
+
+
+def get_stage_plan(cabinet_type, quantity):
+    """Look up the precomputed stage plan for a cabinet type and quantity."""
+    routing_name = resolve_routing(cabinet_type)
+    plan = STAGE_DURATION_TABLE.get((routing_name, quantity))
+    if plan is None:
+        # Quantities outside the precomputed range are compiled on demand.
+        plan = compile_stage_plan(ROUTING_CONFIG["routings"][routing_name], quantity, PROCESS_CATALOG)
+    return plan
+
+
+def get_file_stamp(path):
+    """Return (mtime, size) for a file, or None when it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_json_file(path, default):
+    """Read a JSON file, skipping the disk read while the file is unchanged."""
+    stamp = get_file_stamp(path)
+    if stamp is None:
+        return default
+    cached = _file_cache.get(path)
+    if cached is None or cached[0] != stamp:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            cached = (stamp, f.read())
+        _file_cache[path] = cached
+    return json.loads(cached[1])
+
+
+def write_json_file(path, data):
+    """Write a JSON file atomically so readers never wait on or see a partial write."""
+    text = json.dumps(data, indent=2)
+    with _storage_lock:
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(temp_path, path)
+        _file_cache[path] = (get_file_stamp(path), text)
 
 
 def load_orders():
     """Load orders from JSON file."""
-    if os.path.exists(ORDERS_FILE):
-        with open(ORDERS_FILE, "r", encoding="utf-8-sig") as f:
-            return json.load(f)
-    return []
+    return read_json_file(ORDERS_FILE, [])
 
 
 def save_orders(orders):
     """Save orders to JSON file."""
-    with open(ORDERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(orders, f, indent=2)
+    write_json_file(ORDERS_FILE, orders)
+
+
+def load_deleted_order_ids():
+    """Load IDs of deleted orders so they are never reused or restored by sync."""
+    data = read_json_file(DELETED_ORDERS_FILE, [])
+    return set(data) if isinstance(data, list) else set()
+
+
+def save_deleted_order_ids(order_ids):
+    """Save deleted order IDs to JSON file."""
+    write_json_file(DELETED_ORDERS_FILE, sorted(order_ids))
+
+
+def next_order_id(orders, deleted_ids):
+    """Return an order ID that has never been used, even by deleted orders."""
+    return max([int(item.get("id", 0)) for item in orders] + list(deleted_ids) + [0]) + 1
+
+
+def order_identity_signature(order):
+    """Match the frontend's getOrderSignature: fields fixed when the order is created."""
+    try:
+        quantity = int(float(order.get("quantity") or 0))
+    except (TypeError, ValueError):
+        quantity = 0
+    return "|".join([
+        str(order.get("customer_name") or "").strip().lower(),
+        str(order.get("cabinet_type") or "").strip().lower(),
+        str(order.get("color") or "").strip().lower(),
+        str(quantity),
+        str(order.get("completion_date") or ""),
+    ])
+
+
+def order_sync_signature(order):
+    """Signature of everything a client displays for an order, used to find stale copies."""
+    return "|".join([
+        order_identity_signature(order),
+        str(order.get("start_date") or ""),
+        str(order.get("line") or DEFAULT_LINE),
+        ",".join(order.get("completed_processes") or []),
+        str(order.get("active_process_progress") or 0),
+        str(order.get("status") or ""),
+        str(order.get("priority") or ""),
+    ])
 
 
 def load_attendance():
     """Load attendance records from JSON file."""
-    if os.path.exists(ATTENDANCE_FILE):
-        with open(ATTENDANCE_FILE, "r", encoding="utf-8-sig") as f:
-            data = json.load(f)
-            return data if isinstance(data, list) else []
-    return []
+    data = read_json_file(ATTENDANCE_FILE, [])
+    return data if isinstance(data, list) else []
 
 
 def save_attendance(records):
     """Save attendance records to JSON file."""
-    with open(ATTENDANCE_FILE, "w", encoding="utf-8") as f:
-        json.dump(records, f, indent=2)
+    write_json_file(ATTENDANCE_FILE, records)
 
 
 def build_absence_index(attendance_records):
@@ -164,6 +332,7 @@ def normalize_order_state(order):
         name for name in raw_completed
         if isinstance(name, str) and name in allowed
     )
+    completed_set |= ROUTING_SKIPPED_PROCESSES[resolve_routing(order.get("cabinet_type"))]
 
     completed = []
     for process in PROCESS_FLOW:
@@ -251,60 +420,83 @@ def calculate_daily_progress(days):
     return 100 / days
 
 
-def calculate_machine_schedule(orders, attendance_records=None):
-    """Calculate resource allocation (workers and machines) for each order."""
-    absence_index = build_absence_index(attendance_records or [])
+# Computed schedules keyed by (orders, attendance, resources, as_of_date), least recent first.
+SCHEDULE_CACHE_SIZE = 8
+_schedule_cache = OrderedDict()
+_schedule_cache_lock = threading.Lock()
+# Orders with this many days of slack or fewer are flagged as at risk.
+RISK_SLACK_DAYS = 2
+# Only work that must start within this many days gets workers and machines assigned.
+# Later LOW-priority orders are planned as rough-cut load per role and week.
+SCHEDULE_HORIZON_DAYS = 14
 
-    # Resource pools initialized as available today.
-    machines = {
-        "MO1": {"name": "MO1 CNC Cutting", "process": "CNC Cutting", "available_until": datetime.now().date()},
-        "MO2": {"name": "MO2 CNC Edging", "process": "CNC Edging", "available_until": datetime.now().date()},
-        "MO3": {"name": "MO3 CNC Routing", "process": "CNC Routing", "available_until": datetime.now().date()}
-    }
-    
-    workers = {
-        # Dedicated machine operators.
-        "MO1": {"name": "MO1", "type": "MO1 Operator", "available_until": datetime.now().date()},
-        "MO2": {"name": "MO2", "type": "MO2 Operator", "available_until": datetime.now().date()},
-        "MO3": {"name": "MO3", "type": "MO3 Operator", "available_until": datetime.now().date()},
-        # Carpenters.
-        "C1": {"name": "C1", "type": "Carpenter", "available_until": datetime.now().date()},
-        "C2": {"name": "C2", "type": "Carpenter", "available_until": datetime.now().date()},
-        "C3": {"name": "C3", "type": "Carpenter", "available_until": datetime.now().date()},
-        "C4": {"name": "C4", "type": "Carpenter", "available_until": datetime.now().date()},
-        "C5": {"name": "C5", "type": "Carpenter", "available_until": datetime.now().date()},
-        "C6": {"name": "C6", "type": "Carpenter", "available_until": datetime.now().date()},
-        # Non-skilled helpers.
-        "NSH1": {"name": "NSH1", "type": "Helper", "available_until": datetime.now().date()},
-        "NSH2": {"name": "NSH2", "type": "Helper", "available_until": datetime.now().date()},
-        "NSH3": {"name": "NSH3", "type": "Helper", "available_until": datetime.now().date()},
-        "NSH4": {"name": "NSH4", "type": "Helper", "available_until": datetime.now().date()},
-        "NSH5": {"name": "NSH5", "type": "Helper", "available_until": datetime.now().date()},
-        "NSH6": {"name": "NSH6", "type": "Helper", "available_until": datetime.now().date()},
-        "NSH7": {"name": "NSH7", "type": "Helper", "available_until": datetime.now().date()},
-        "NSH8": {"name": "NSH8", "type": "Helper", "available_until": datetime.now().date()},
-    }
-    
-    # Process template: machine binding, labor type, and per-cabinet hours.
-    processes = [
-        {"name": "CNC Cutting", "machine": "MO1", "worker_type": "MO1 Operator", "hours_per_cabinet": 1.5},
-        {"name": "CNC Edging", "machine": "MO2", "worker_type": "MO2 Operator", "hours_per_cabinet": 1.5},
-        {"name": "CNC Routing", "machine": "MO3", "worker_type": "MO3 Operator", "hours_per_cabinet": 1.5},
-        {"name": "Assembly", "machine": None, "worker_type": "Carpenter", "hours_per_cabinet": 4},
-        {"name": "Quality Assurance", "machine": None, "worker_type": "Carpenter", "hours_per_cabinet": 0.5},
-        {"name": "Packing", "machine": None, "worker_type": "Helper", "hours_per_cabinet": 1}
-    ]
-    
-    work_hours_per_day = 7
-    
-    # Dispatch rule: priority first, then earliest due date.
-    sorted_orders = sorted(orders, key=lambda x: (
+
+def get_order_line(order):
+    """Return the production line for an order, defaulting legacy orders to the first line."""
+    line = str(order.get("line") or "").strip().upper()
+    return line if line in PRODUCTION_LINES else DEFAULT_LINE
+
+
+def build_resource_pools(available_from, line=DEFAULT_LINE):
+    """Create worker and machine pools for one line that are all free from the given day."""
+    machines = {}
+    workers = {}
+    for entry in RESOURCE_CATALOG:
+        if entry.get("line", DEFAULT_LINE) != line:
+            continue
+        resource_id = entry["id"]
+        role = entry["role"]
+        if role == "Machine Operator":
+            station = entry.get("machine", resource_id)
+            process_name = next(
+                (process["name"] for process in ROUTING_CONFIG["processes"] if process.get("machine") == station),
+                None
+            )
+            # Dedicated machine operators share their ID with the machine they run.
+            machines[resource_id] = {
+                "name": f"{resource_id} {process_name}",
+                "process": process_name,
+                "station": station,
+                "available_until": available_from
+            }
+            worker_type = f"{station} Operator"
+        elif role == "Carpenter":
+            worker_type = "Carpenter"
+        else:
+            worker_type = "Helper"
+        workers[resource_id] = {"name": resource_id, "type": worker_type, "available_until": available_from}
+    return workers, machines
+
+
+def copy_resource_pools(workers, machines):
+    """Copy resource pools so a trial schedule does not touch the originals."""
+    return (
+        {resource_id: dict(worker) for resource_id, worker in workers.items()},
+        {resource_id: dict(machine) for resource_id, machine in machines.items()}
+    )
+
+
+def sort_orders_for_dispatch(orders):
+    """Dispatch rule: priority first, then earliest due date."""
+    return sorted(orders, key=lambda x: (
         {"HIGH": 0, "MEDIUM": 1, "LOW": 2}.get(x.get("priority", "LOW"), 2),
         x.get("completion_date", "")
     ))
-    
-    schedule = {}
+
+
+def schedule_order(order, workers, machines, absence_index):
+    """Schedule every stage of one order, reserving resources in the given pools.
+
+    Returns the per-stage schedule and the flattened assignment rows.
+    """
+    order_name = f"O-{order['id']}"
+    quantity = order.get("quantity", 1)
+    order_start = datetime.strptime(order["start_date"], "%Y-%m-%d").date()
+
+    order_schedule = {}
     assignments = []
+    # Routing machine names resolve to this line's machines.
+    stations = {machine["station"]: machine_id for machine_id, machine in machines.items()}
 
     def find_worker_start(worker_id, earliest_start, machine_id, days_needed):
         """Return the earliest valid start for a worker, honoring machine lock and absences."""
@@ -321,228 +513,584 @@ def calculate_machine_schedule(orders, attendance_records=None):
                 absence_index
             )
         return candidate_start
-    
-    for order in sorted_orders:
-        order_id = order["id"]
-        order_name = f"O-{order_id}"
-        quantity = order.get("quantity", 1)
-        order_start = datetime.strptime(order["start_date"], "%Y-%m-%d").date()
-        
-        order_schedule = {}
-        
-        # Enforce fixed process sequence for each order.
-        for process in processes:
-            process_name = process["name"]
-            machine_id = process["machine"]
-            worker_type = process["worker_type"]
-            hours_needed = process["hours_per_cabinet"] * quantity
-            days_needed = max(1, int(hours_needed / work_hours_per_day))
-            
-            available_workers = []
-            if process_name == "Assembly":
-                # Assembly needs a team: 2 carpenters + 1 helper (duration unchanged).
-                role_requirements = [("Carpenter", 2), ("Helper", 1)]
-                selected_workers = []
-                team_start = order_start
-
-                for role_name, required_count in role_requirements:
-                    role_candidates = []
-                    for worker_id, worker in workers.items():
-                        if worker["type"] != role_name or worker_id in selected_workers:
-                            continue
-                        candidate_start = find_worker_start(worker_id, order_start, None, days_needed)
-                        role_candidates.append((candidate_start, worker_id))
-
-                    role_candidates.sort(key=lambda item: (item[0], item[1]))
-                    chosen = role_candidates[:required_count]
-                    if len(chosen) < required_count:
-                        selected_workers = []
-                        break
-
-                    selected_workers.extend(worker_id for _, worker_id in chosen)
-                    latest_role_start = max(start_date for start_date, _ in chosen)
-                    if latest_role_start > team_start:
-                        team_start = latest_role_start
-
-                if not selected_workers:
-                    continue
-
-                # Align the team start so every selected worker is available for the full stage span.
-                while True:
-                    adjusted = False
-                    for worker_id in selected_workers:
-                        candidate_start = find_worker_start(worker_id, team_start, None, days_needed)
-                        if candidate_start > team_start:
-                            team_start = candidate_start
-                            adjusted = True
-                    if not adjusted:
-                        break
-
-                available_workers = selected_workers
-                start_date = team_start
-            else:
-                # Select the earliest-available worker for the required role.
-                available_worker = None
-                best_start_date = None
+
+    # Enforce the routing's process sequence: each stage starts after the previous one ends.
+    stage_ready = order_start
+    for stage in get_stage_plan(order.get("cabinet_type"), quantity):
+        process_name = stage.name
+        machine_id = stations.get(stage.machine) if stage.machine else None
+        if stage.machine and machine_id is None:
+            continue
+        worker_type = stage.worker_type
+        days_needed = stage.days
+
+        available_workers = []
+        if stage.team:
+            # Team stages (e.g. Assembly: 2 carpenters + 1 helper) keep the same duration.
+            role_requirements = stage.team
+            selected_workers = []
+            team_start = stage_ready
+
+            for role_name, required_count in role_requirements:
+                role_candidates = []
                 for worker_id, worker in workers.items():
-                    if worker["type"] == worker_type:
-                        if machine_id and worker_id != machine_id:
-                            continue
-
-                        candidate_start = find_worker_start(worker_id, order_start, machine_id, days_needed)
-                        if best_start_date is None or candidate_start < best_start_date:
-                            best_start_date = candidate_start
-                            available_worker = worker_id
-
-                if available_worker is None:
-                    continue
-
-                available_workers = [available_worker]
-                start_date = best_start_date
-            
-            end_date = start_date + timedelta(days=days_needed)
-            
-            # Store stage dates for schedule visualization.
-            order_schedule[process_name] = {
-                "start": start_date.strftime("%Y-%m-%d"),
-                "end": end_date.strftime("%Y-%m-%d"),
-                "days": days_needed,
-                "worker": ", ".join(available_workers),
-                "machine": machine_id if machine_id else "N/A"
-            }
-            
-            # Store flattened rows for frontend assignment table.
-            assignments.append({
-                "order": order_name,
-                "process": process_name,
-                "worker": ", ".join(available_workers),
-                "machine": machine_id if machine_id else "N/A"
-            })
-            
-            # Reserve resources until this stage completes.
-            for worker_id in available_workers:
-                workers[worker_id]["available_until"] = end_date
-            if machine_id:
-                machines[machine_id]["available_until"] = end_date
-        
-        schedule[str(order_id)] = order_schedule
-    
-    return {"schedule": schedule, "assignments": assignments}
-
-
-def calculate_scheduled_dates(completion_date, quantity, orders):
-    """Calculate realistic start date based on machine capacity."""
-    # Standard process hours per cabinet.
-    stages = {
-        "CNC Cutting": 1.5,          # 15%
-        "CNC Edging": 1.5,           # 15%
-        "CNC Routing": 1.5,          # 15%
-        "Assembly": 4,               # 40%
-        "Quality Assurance": 0.5,    # 5%
-        "Packing": 1                 # 10%
-    }
-    
-    total_hours = sum(stages.values()) * quantity
-    machines_available = 6  # Total machines
-    work_hours_per_day = 7  # 8:00-16:00 with 12:00-13:00 break
-    
-    # Build daily machine-load map from active orders.
-    daily_capacity = {}
+                    if worker["type"] != role_name or worker_id in selected_workers:
+                        continue
+                    candidate_start = find_worker_start(worker_id, stage_ready, None, days_needed)
+                    role_candidates.append((candidate_start, worker_id))
+
+                role_candidates.sort(key=lambda item: (item[0], item[1]))
+                chosen = role_candidates[:required_count]
+                if len(chosen) < required_count:
+                    selected_workers = []
+                    break
+
+                selected_workers.extend(worker_id for _, worker_id in chosen)
+                latest_role_start = max(start_date for start_date, _ in chosen)
+                if latest_role_start > team_start:
+                    team_start = latest_role_start
+
+            if not selected_workers:
+                continue
+
+            # Align the team start so every selected worker is available for the full stage span.
+            while True:
+                adjusted = False
+                for worker_id in selected_workers:
+                    candidate_start = find_worker_start(worker_id, team_start, None, days_needed)
+                    if candidate_start > team_start:
+                        team_start = candidate_start
+                        adjusted = True
+                if not adjusted:
+                    break
+
+            available_workers = selected_workers
+            start_date = team_start
+        else:
+            # Select the earliest-available worker for the required role.
+            available_worker = None
+            best_start_date = None
+            for worker_id, worker in workers.items():
+                if worker["type"] == worker_type:
+                    if machine_id and worker_id != machine_id:
+                        continue
+
+                    candidate_start = find_worker_start(worker_id, stage_ready, machine_id, days_needed)
+                    if best_start_date is None or candidate_start < best_start_date:
+                        best_start_date = candidate_start
+                        available_worker = worker_id
+
+            if available_worker is None:
+                continue
+
+            available_workers = [available_worker]
+            start_date = best_start_date
+
+        end_date = start_date + timedelta(days=days_needed)
+
+        # Store stage dates for schedule visualization.
+        order_schedule[process_name] = {
+            "start": start_date.strftime("%Y-%m-%d"),
+            "end": end_date.strftime("%Y-%m-%d"),
+            "days": days_needed,
+            "worker": ", ".join(available_workers),
+            "machine": machine_id if machine_id else "N/A"
+        }
+
+        # Store flattened rows for frontend assignment table.
+        assignments.append({
+            "order": order_name,
+            "process": process_name,
+            "worker": ", ".join(available_workers),
+            "machine": machine_id if machine_id else "N/A"
+        })
+
+        # Reserve resources until this stage completes.
+        stage_ready = end_date
+        for worker_id in available_workers:
+            workers[worker_id]["available_until"] = end_date
+        if machine_id:
+            machines[machine_id]["available_until"] = end_date
+
+    return order_schedule, assignments
+
+
+def get_remaining_stage_plan(order):
+    """Return the stage plans an order still has to run."""
+    completed = set(order.get("completed_processes") or [])
+    return [
+        stage for stage in get_stage_plan(order.get("cabinet_type"), order.get("quantity", 1))
+        if stage.name not in completed
+    ]
+
+
+def split_by_horizon(orders, horizon_end):
+    """Split orders into those scheduled in detail and LOW-priority ones that can wait.
+
+    An open order waits while its latest possible start (due date minus remaining stage
+    days) is on or after the horizon end, so it is promoted as the window moves forward.
+    """
+    detailed = []
+    deferred = []
     for order in orders:
-        if order.get("status") != "Completed":
-            start = datetime.strptime(order["start_date"], "%Y-%m-%d").date()
-            end = datetime.strptime(order["completion_date"], "%Y-%m-%d").date()
-            days_span = (end - start).days + 1
-            
-            for i in range(days_span):
-                day = start + timedelta(days=i)
-                day_str = day.strftime("%Y-%m-%d")
-                daily_capacity[day_str] = daily_capacity.get(day_str, 0) + order["machines"]
-    
-    # Compute candidate start from the requested due date.
-    target_end = datetime.strptime(completion_date, "%Y-%m-%d").date()
-    days_needed = max(1, int(total_hours / (machines_available * work_hours_per_day)))
-    
-    # Back-schedule from requested completion.
-    current_start = target_end - timedelta(days=days_needed)
-    current_date = datetime.now().date()
-    
-    # Prevent scheduling in the past.
-    if current_start < current_date:
-        current_start = current_date
-    
-    # Shift start earlier when daily machine capacity is exceeded.
-    machines_needed = 1
-    for i in range(days_needed):
-        check_date = (current_start + timedelta(days=i)).strftime("%Y-%m-%d")
-        used = daily_capacity.get(check_date, 0)
-        if used + machines_needed > machines_available:
-            current_start = current_start - timedelta(days=1)
-    
-    # Recompute end date after start-date adjustments.
-    actual_end = current_start + timedelta(days=days_needed)
-    
-    # Clamp end date to requested completion.
-    if actual_end > target_end:
-        actual_end = target_end
-    
-    return current_start.strftime("%Y-%m-%d"), actual_end.strftime("%Y-%m-%d")
+        # Completed orders are LOW priority too, but have nothing left to plan.
+        if order.get("priority") == "LOW" and order.get("status") != "Completed":
+            due = datetime.strptime(order["completion_date"], "%Y-%m-%d").date()
+            remaining_days = sum(stage.days for stage in get_remaining_stage_plan(order))
+            if due - timedelta(days=remaining_days) >= horizon_end:
+                deferred.append(order)
+                continue
+        detailed.append(order)
+    return detailed, deferred
+
+
+def build_capacity_buckets(deferred, schedule, workers, absence_index, horizon_end):
+    """Compare worker-day load with capacity per role and week after the horizon end."""
+    buckets = {}
+    horizon_str = horizon_end.strftime("%Y-%m-%d")
+
+    def add_load(role, start, end, count, order_id):
+        # Spread count workers over [start, end), one step per week the span overlaps.
+        day = max(start, horizon_end)
+        while day < end:
+            week_start = day - timedelta(days=day.weekday())
+            week_end = min(end, week_start + timedelta(days=7))
+            bucket = buckets.setdefault((week_start, role), {"load_days": 0, "orders": set()})
+            bucket["load_days"] += (week_end - day).days * count
+            bucket["orders"].add(order_id)
+            day = week_end
+
+    # Detailed stages that run past the horizon still use capacity there.
+    for order_id, order_schedule in schedule.items():
+        for stage in order_schedule.values():
+            if stage["end"] <= horizon_str:
+                continue
+            start = datetime.strptime(stage["start"], "%Y-%m-%d").date()
+            end = datetime.strptime(stage["end"], "%Y-%m-%d").date()
+            role_counts = {}
+            for worker_id in stage["worker"].split(", "):
+                role_name = workers[worker_id]["type"]
+                role_counts[role_name] = role_counts.get(role_name, 0) + 1
+            for role_name, count in role_counts.items():
+                add_load(role_name, start, end, count, int(order_id))
+
+    # Deferred orders are back-scheduled from their due date without picking resources.
+    for order in deferred:
+        cursor = datetime.strptime(order["completion_date"], "%Y-%m-%d").date()
+        for stage in reversed(get_remaining_stage_plan(order)):
+            stage_end = cursor
+            cursor = cursor - timedelta(days=stage.days)
+            for role_name, count in stage.team or ((stage.worker_type, 1),):
+                add_load(role_name, cursor, stage_end, count, order["id"])
+
+    role_workers = {}
+    for worker_id, worker in workers.items():
+        role_workers.setdefault(worker["type"], []).append(worker_id)
+
+    rows = []
+    for (week_start, role_name), bucket in sorted(buckets.items()):
+        days = [
+            week_start + timedelta(days=offset) for offset in range(7)
+            if week_start + timedelta(days=offset) >= horizon_end
+        ]
+        capacity = sum(
+            1 for day in days for worker_id in role_workers.get(role_name, [])
+            if not is_absent_on(absence_index, worker_id, day)
+        )
+        rows.append({
+            "week_start": week_start.strftime("%Y-%m-%d"),
+            "role": role_name,
+            "capacity_days": capacity,
+            "load_days": bucket["load_days"],
+            "utilization": round(bucket["load_days"] / capacity, 3) if capacity else None,
+            "overloaded": bucket["load_days"] > capacity,
+            "orders": sorted(bucket["orders"]),
+        })
+    return rows
+
+
+def schedule_shard(line, orders, absence_index, available_from, horizon_days=None):
+    """Schedule one line's orders against that line's resource pool.
+
+    With a horizon, only near-term orders are assigned resources; the rest are
+    summarized as rough-cut capacity buckets.
+    """
+    workers, machines = build_resource_pools(available_from, line)
+    if horizon_days is None:
+        detailed, deferred = orders, []
+    else:
+        horizon_end = available_from + timedelta(days=horizon_days)
+        detailed, deferred = split_by_horizon(orders, horizon_end)
 
+    schedule = {}
+    assignments = []
+    for order in sort_orders_for_dispatch(detailed):
+        order_schedule, order_assignments = schedule_order(order, workers, machines, absence_index)
+        schedule[str(order["id"])] = order_schedule
+        assignments.extend(order_assignments)
+
+    buckets = []
+    if horizon_days is not None:
+        buckets = build_capacity_buckets(deferred, schedule, workers, absence_index, horizon_end)
+        for bucket in buckets:
+            bucket["line"] = line
+    # Deferred orders keep an empty schedule until the window reaches them.
+    for order in deferred:
+        schedule[str(order["id"])] = {}
+
+    return {
+        "schedule": schedule,
+        "assignments": assignments,
+        "workers": workers,
+        "machines": machines,
+        "deferred": [order["id"] for order in deferred],
+        "buckets": buckets,
+    }
 
-@app.route("/orders", methods=["GET"])
-def get_orders():
-    """Get all orders with manual progress state, sorted by due date."""
-    orders = load_orders()
-    # Optional reference date override for deterministic runs (YYYY-MM-DD).
-    date_override = request.args.get("date")
-    if date_override:
-        try:
-            today = datetime.strptime(date_override, "%Y-%m-%d").date()
-        except ValueError:
-            return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
+
+def get_shard_executor():
+    """Return the shared process pool used for scheduling large order books."""
+    global _shard_executor
+    with _shard_executor_lock:
+        if _shard_executor is None:
+            # Forking while server threads may hold locks can deadlock the child.
+            # Windows has no forkserver, so it spawns fresh interpreters instead.
+            start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _shard_executor = ProcessPoolExecutor(
+                max_workers=SCHEDULE_WORKERS,
+                mp_context=multiprocessing.get_context(start_method)
+            )
+        return _shard_executor
+
+
+def run_machine_schedule(orders, absence_index, as_of_date, horizon_days=None):
+    """Schedule all orders line by line and keep the final resource timelines.
+
+    Pass horizon_days to schedule in rolling-horizon mode (see split_by_horizon).
+    """
+    shards = {}
+    for order in orders:
+        shards.setdefault(get_order_line(order), []).append(order)
+
+    if len(orders) >= PARALLEL_MIN_ORDERS and (SCHEDULE_IN_PROCESS or len(shards) > 1):
+        # Lines share no resources, so each shard is scheduled in its own process.
+        executor = get_shard_executor()
+        futures = {
+            line: executor.submit(schedule_shard, line, line_orders, absence_index, as_of_date, horizon_days)
+            for line, line_orders in shards.items()
+        }
+        results = {line: future.result() for line, future in futures.items()}
     else:
-        today = datetime.now().date()
+        results = {
+            line: schedule_shard(line, line_orders, absence_index, as_of_date, horizon_days)
+            for line, line_orders in shards.items()
+        }
 
+    schedule = {}
+    assignments = []
+    pools = {}
+    deferred = []
+    buckets = []
+    for line in sorted(results):
+        schedule.update(results[line]["schedule"])
+        assignments.extend(results[line]["assignments"])
+        pools[line] = (results[line]["workers"], results[line]["machines"])
+        deferred.extend(results[line]["deferred"])
+        buckets.extend(results[line]["buckets"])
+
+    rough_cut = None
+    if horizon_days is not None:
+        rough_cut = {
+            "horizon_end": (as_of_date + timedelta(days=horizon_days)).strftime("%Y-%m-%d"),
+            "deferred": sorted(deferred),
+            "buckets": buckets,
+        }
+    return {"schedule": schedule, "assignments": assignments, "pools": pools, "rough_cut": rough_cut}
+
+
+def compute_schedule(orders, attendance_records, as_of_date, horizon_days=SCHEDULE_HORIZON_DAYS):
+    """Normalize orders and schedule them as of a reference date.
+
+    Depends only on its arguments and never modifies them, so results can be cached.
+    Pass horizon_days=None to assign resources to every order.
+    """
+    prepared = [dict(order) for order in orders]
     orders_changed = False
-    for order in orders:
+    for order in prepared:
         if sanitize_order_dates(order):
             orders_changed = True
         normalize_order_state(order)
-        apply_priority_settings(order, today)
+        apply_priority_settings(order, as_of_date)
+
+    absence_index = build_absence_index(attendance_records)
+    result = run_machine_schedule(prepared, absence_index, as_of_date, horizon_days)
+    result.update({
+        "orders": prepared,
+        "orders_changed": orders_changed,
+        "absence_index": absence_index,
+        "as_of": as_of_date,
+    })
+    return result
 
-    if orders_changed:
-        save_orders(orders)
+
+def fingerprint(value):
+    """Hash JSON-serializable data into a short, stable cache key."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+RESOURCES_FINGERPRINT = fingerprint([RESOURCE_CATALOG, ROUTING_CONFIG])
+
+
+def get_schedule(orders, attendance_records, as_of_date, horizon_days=SCHEDULE_HORIZON_DAYS):
+    """Return the schedule for these inputs, reusing a cached result when one exists.
+
+    Cached results are shared between requests: callers may attach derived data
+    (such as risk analytics) but must not change the scheduled data.
+    """
+    key = (fingerprint(orders), fingerprint(attendance_records), RESOURCES_FINGERPRINT, as_of_date, horizon_days)
+    with _schedule_cache_lock:
+        result = _schedule_cache.get(key)
+        if result is not None:
+            _schedule_cache.move_to_end(key)
+            return result
+
+    result = compute_schedule(orders, attendance_records, as_of_date, horizon_days)
+    # Version of the order book as it is stored once normalized orders are saved.
+    result["orders_version"] = fingerprint(result["orders"]) if result["orders_changed"] else key[0]
+
+    with _schedule_cache_lock:
+        _schedule_cache[key] = result
+        while len(_schedule_cache) > SCHEDULE_CACHE_SIZE:
+            _schedule_cache.popitem(last=False)
+    return result
+
+
+def calculate_machine_schedule(orders, attendance_records=None, as_of_date=None, horizon_days=None):
+    """Calculate resource allocation (workers and machines) for each order.
+
+    With horizon_days, orders beyond the window are returned as rough-cut buckets instead.
+    """
+    as_of_date = as_of_date or datetime.now().date()
+    absence_index = build_absence_index(attendance_records or [])
+    result = run_machine_schedule(orders, absence_index, as_of_date, horizon_days=horizon_days)
+    if horizon_days is None:
+        return {"schedule": result["schedule"], "assignments": result["assignments"]}
+    return {"schedule": result["schedule"], "assignments": result["assignments"], "rough_cut": result["rough_cut"]}
+
+
+def quote_order(order, result):
+    """Schedule a prospective order after the current backlog without persisting anything."""
+    line = get_order_line(order)
+    if line in result["pools"]:
+        workers, machines = copy_resource_pools(*result["pools"][line])
+    else:
+        # No open orders on this line yet, so its resources are all free.
+        workers, machines = build_resource_pools(result["as_of"], line)
+    order_schedule, _ = schedule_order(order, workers, machines, result["absence_index"])
+    completion = max((stage["end"] for stage in order_schedule.values()), default=order["start_date"])
+    return order_schedule, completion
+
+
+def calculate_risk_analytics(orders, schedule, today, rough_cut=None):
+    """Derive per-order slack, critical stage and resource load from a computed schedule.
+
+    Orders deferred by the rolling horizon are counted from the rough-cut plan.
+    """
+    today_ordinal = today.toordinal()
+    resource_index = {}
+    resource_kinds = []
+    busy_days = []
+    stage_counts = []
+    late_counts = []
+    last_day = today_ordinal
+
+    def resource_slot(resource_id, kind):
+        # Operators share IDs with their machines, so slots are keyed by kind too.
+        slot = resource_index.get((resource_id, kind))
+        if slot is None:
+            slot = resource_index[(resource_id, kind)] = len(resource_kinds)
+            resource_kinds.append(kind)
+            busy_days.append(0)
+            stage_counts.append(0)
+            late_counts.append(0)
+        return slot
+
+    order_rows = []
+    for order in orders:
+        if order.get("status") == "Completed":
+            continue
+        stages = schedule.get(str(order["id"])) or {}
+        if not stages:
+            continue
+
+        # The stage that finishes last decides the order's completion.
+        critical_name, critical = max(stages.items(), key=lambda item: item[1]["end"])
+        end_ordinal = datetime.fromisoformat(critical["end"]).toordinal()
+        due_ordinal = datetime.fromisoformat(order["completion_date"]).toordinal()
+        slack = due_ordinal - end_ordinal
+        last_day = max(last_day, end_ordinal)
+
+        slots = []
+        for stage in stages.values():
+            resource_ids = [(worker_id, "worker") for worker_id in stage["worker"].split(", ") if worker_id]
+            if stage["machine"] != "N/A":
+                resource_ids.append((stage["machine"], "machine"))
+            for resource_id, kind in resource_ids:
+                slot = resource_slot(resource_id, kind)
+                busy_days[slot] += stage["days"]
+                stage_counts[slot] += 1
+                slots.append(slot)
+        if slack < 0:
+            for slot in set(slots):
+                late_counts[slot] += 1
+
+        order_rows.append({
+            "id": order["id"],
+            "customer_name": order.get("customer_name"),
+            "priority": order.get("priority"),
+            "completion_date": order["completion_date"],
+            "scheduled_end": critical["end"],
+            "slack_days": slack,
+            "late": slack < 0,
+            "at_risk": slack <= RISK_SLACK_DAYS,
+            "critical_stage": critical_name,
+            "critical_resource": critical["worker"],
+        })
+    order_rows.sort(key=lambda row: (row["slack_days"], row["completion_date"]))
+
+    horizon_days = max(1, last_day - today_ordinal)
+    ranking = sorted(range(len(resource_kinds)), key=lambda slot: (-busy_days[slot], -late_counts[slot]))
+    resource_ids = [resource_id for resource_id, _ in resource_index]
+    resource_rows = [
+        {
+            "rank": rank,
+            "id": resource_ids[slot],
+            "kind": resource_kinds[slot],
+            "busy_days": busy_days[slot],
+            "stages": stage_counts[slot],
+            "late_orders": late_counts[slot],
+            "utilization": round(min(1.0, busy_days[slot] / horizon_days), 3),
+        }
+        for rank, slot in enumerate(ranking, start=1)
+    ]
+
+    # A dedicated operator and the machine it runs are one bottleneck, not two.
+    bottlenecks = []
+    for row in resource_rows:
+        if row["id"] not in {item["id"] for item in bottlenecks}:
+            bottlenecks.append({"id": row["id"], "kind": row["kind"]})
+        if len(bottlenecks) == 3:
+            break
+
+    # Deferred orders have no stage dates yet; an overloaded week is their risk.
+    deferred_ids = set(rough_cut["deferred"]) if rough_cut else set()
+    deferred_ids -= {order["id"] for order in orders if order.get("status") == "Completed"}
+    overloaded = [bucket for bucket in (rough_cut["buckets"] if rough_cut else []) if bucket["overloaded"]]
+    deferred_at_risk = deferred_ids & {order_id for bucket in overloaded for order_id in bucket["orders"]}
+
+    return {
+        "as_of": today.strftime("%Y-%m-%d"),
+        "horizon_days": horizon_days,
+        "summary": {
+            "open_orders": len(order_rows) + len(deferred_ids),
+            "late": sum(1 for row in order_rows if row["late"]),
+            "at_risk": sum(1 for row in order_rows if row["at_risk"]) + len(deferred_at_risk),
+            "deferred": len(deferred_ids),
+            "overloaded_buckets": len(overloaded),
+        },
+        "bottlenecks": bottlenecks,
+        "orders": order_rows,
+        "resources": resource_rows,
+        "overloaded_buckets": overloaded,
+    }
+
+
+def get_reference_date():
+    """Return the request's ?date= override (YYYY-MM-DD), or today's date."""
+    date_override = request.args.get("date")
+    if date_override:
+        return datetime.strptime(date_override, "%Y-%m-%d").date()
+    return datetime.now().date()
+
+
+def get_json_payload():
+    """Return the request's JSON body as a dict, or None when it is not a JSON object."""
+    payload = request.get_json(silent=True)
+    if payload is None:
+        return {}
+    return payload if isinstance(payload, dict) else None
+
+
+def get_current_schedule(today, horizon_days=SCHEDULE_HORIZON_DAYS):
+    """Schedule the stored order book and attendance as of the given day.
+
+    Orders whose dates had to be repaired are saved back.
+    """
+    result = get_schedule(load_orders(), load_attendance(), today, horizon_days=horizon_days)
+    if result["orders_changed"]:
+        # Reschedule under the lock so a write made in the meantime is not overwritten.
+        with _storage_lock:
+            result = get_schedule(load_orders(), load_attendance(), today, horizon_days=horizon_days)
+            if result["orders_changed"]:
+                save_orders(result["orders"])
+    return result
+
+
+@app.route("/orders", methods=["GET"])
+def get_orders():
+    """Get all orders with manual progress state, sorted by due date."""
+    # Optional reference date override for deterministic runs (YYYY-MM-DD).
+    try:
+        today = get_reference_date()
+    except ValueError:
+        return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
+
+    result = get_current_schedule(today)
 
     # Return orders in earliest-due-date order.
-    orders.sort(key=lambda x: x["completion_date"])
-    
-    # Build schedule and assignment payloads for the frontend.
-    attendance_records = load_attendance()
-    result = calculate_machine_schedule(orders, attendance_records)
-    
+    orders = sorted(result["orders"], key=lambda x: x["completion_date"])
+
     return jsonify({
         "orders": orders,
+        "version": result["orders_version"],
         "machine_schedule": result["schedule"],
-        "assignments": result["assignments"]
+        "assignments": result["assignments"],
+        "rough_cut": result["rough_cut"]
     })
 
 
-@app.route("/orders", methods=["POST"])
-def create_order():
-    """Create a new order."""
-    payload = request.get_json(silent=True) or {}
-    
+@app.route("/analytics/risk", methods=["GET"])
+def get_risk_analytics():
+    """Return per-order slack, resource load and bottleneck ranking for the current schedule."""
+    try:
+        today = get_reference_date()
+    except ValueError:
+        return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
+
+    # Analytics are derived once per cached schedule version.
+    result = get_current_schedule(today)
+    if "risk" not in result:
+        result["risk"] = calculate_risk_analytics(result["orders"], result["schedule"], today, result["rough_cut"])
+    return jsonify(result["risk"])
+
+
+def build_order_from_payload(payload, order_id, today):
+    """Validate an order payload and build the stored order record.
+
+    Raises ValueError with a user-facing message when the payload is invalid.
+    """
     # Validate required fields and quantity limits.
     required = ["customer_name", "cabinet_type", "color", "quantity", "completion_date", "start_date"]
     if not all(payload.get(key) for key in required):
-        return jsonify({"error": "Missing required fields"}), 400
-    
+        raise ValueError("Missing required fields")
+
     try:
         qty = int(payload.get("quantity"))
-        if qty < 3 or qty > 50:
-            raise ValueError("Quantity must be between 3 and 50")
     except (TypeError, ValueError) as e:
-        return jsonify({"error": str(e)}), 400
+        raise ValueError(str(e)) from e
+    if qty < MIN_ORDER_QUANTITY or qty > MAX_ORDER_QUANTITY:
+        raise ValueError(f"Quantity must be between {MIN_ORDER_QUANTITY} and {MAX_ORDER_QUANTITY}")
 
     completion_date = str(payload["completion_date"]).strip()
     start_date = str(payload["start_date"]).strip()
@@ -550,15 +1098,15 @@ def create_order():
         start_date_obj = datetime.strptime(start_date, "%Y-%m-%d").date()
         end_date = datetime.strptime(completion_date, "%Y-%m-%d").date()
     except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+        raise ValueError("Invalid date format. Use YYYY-MM-DD.") from None
 
     if end_date < start_date_obj:
-        return jsonify({"error": "Completion date cannot be earlier than start date."}), 400
+        raise ValueError("Completion date cannot be earlier than start date.")
+
+    line = str(payload.get("line") or DEFAULT_LINE).strip().upper()
+    if line not in PRODUCTION_LINES:
+        raise ValueError("Invalid production line.")
 
-    # Create and persist a new order record.
-    orders = load_orders()
-    today = datetime.now().date()
-    
     # Initialize urgency and machine count from due-date distance.
     days_remaining = (end_date - today).days
     
@@ -573,9 +1121,10 @@ def create_order():
         machines = 1
     
     order = {
-        "id": len(orders) + 1,
+        "id": order_id,
         "customer_name": payload["customer_name"],
         "cabinet_type": payload["cabinet_type"],
+        "line": line,
         "color": payload["color"],
         "quantity": qty,
         "start_date": start_date,
@@ -589,57 +1138,292 @@ def create_order():
     }
     normalize_order_state(order)
     apply_priority_settings(order, today)
+    return order
+
+
+@app.route("/orders", methods=["POST"])
+def create_order():
+    """Create a new order."""
+    payload = get_json_payload()
+    if payload is None:
+        return jsonify({"error": "Request body must be a JSON object."}), 400
+
+    try:
+        today = get_reference_date()
+    except ValueError:
+        return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
+
+    # Create and persist a new order record.
+    with _storage_lock:
+        orders = load_orders()
+        try:
+            order = build_order_from_payload(payload, next_order_id(orders, load_deleted_order_ids()), today)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        orders.append(order)
+        save_orders(orders)
+        return jsonify(order), 201
+
+
+@app.route("/sync", methods=["POST"])
+def sync_orders():
+    """Reconcile a client's cached orders with the server in one batched round trip.
+
+    The client sends the data version it last saw, its cached orders and the orders
+    it deleted while offline as {"id", "signature"}. Orders are matched by ID and
+    identity signature, so repeating a request is a no-op.
+    """
+    payload = get_json_payload()
+    if payload is None:
+        return jsonify({"error": "Request body must be a JSON object."}), 400
+    client_orders = [item for item in payload.get("orders") or [] if isinstance(item, dict)]
+    client_deletes = {}
+    for item in payload.get("deletes") or []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            client_deletes[int(item.get("id"))] = str(item.get("signature") or "")
+        except (TypeError, ValueError):
+            continue
+
+    try:
+        today = get_reference_date()
+    except ValueError:
+        return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
+
+    with _storage_lock:
+        orders = load_orders()
+        # Nothing changed on either side since the client's last sync.
+        if not client_deletes and payload.get("version") == fingerprint(orders):
+            return jsonify({"version": payload.get("version"), "upserts": [], "deletes": [], "id_map": {},
+                            "rejected": [], "changed": False})
+
+        deleted_ids = load_deleted_order_ids()
+        changed = False
+
+        # Client -> server: deletes made while offline. An ID is only removed while it still
+        # names the same order, and only IDs the server has handed out are remembered.
+        server_by_id = {int(item.get("id", 0)): item for item in orders}
+        max_id = next_order_id(orders, deleted_ids) - 1
+        new_deletes = set()
+        for order_id, signature in client_deletes.items():
+            existing = server_by_id.get(order_id)
+            if existing is not None and order_identity_signature(existing) != signature:
+                continue
+            if existing is not None or order_id <= max_id:
+                new_deletes.add(order_id)
+        if new_deletes:
+            orders = [item for item in orders if int(item.get("id", 0)) not in new_deletes]
+            server_by_id = {int(item.get("id", 0)): item for item in orders}
+        if new_deletes - deleted_ids:
+            deleted_ids |= new_deletes
+            save_deleted_order_ids(deleted_ids)
+            changed = True
+
+        # Client -> server: restore orders the server lost. The server wins for known IDs.
+        id_map = {}
+        rejected = []
+        matched_ids = set()
+        collisions = []
+        pending = []
+        for client_order in client_orders:
+            try:
+                client_id = int(client_order.get("id"))
+            except (TypeError, ValueError):
+                continue
+            if client_id in deleted_ids:
+                continue
+            existing = server_by_id.get(client_id)
+            if existing is None:
+                pending.append((client_id, client_id, client_order))
+            elif order_identity_signature(existing) == order_identity_signature(client_order):
+                matched_ids.add(client_id)
+            else:
+                collisions.append((client_id, client_order))
+
+        # A different order took a cached order's ID after data loss. Reuse the copy an earlier
+        # attempt of this restore created, if any server order is the same and still unmatched.
+        unmatched = {}
+        restoring_ids = {order_id for order_id, _, _ in pending}
+        for order_id, item in server_by_id.items():
+            if order_id not in matched_ids:
+                unmatched.setdefault(order_identity_signature(item), []).append(order_id)
+        for client_id, client_order in collisions:
+            earlier = unmatched.get(order_identity_signature(client_order))
+            if earlier:
+                id_map[str(client_id)] = earlier.pop(0)
+            else:
+                pending.append((None, client_id, client_order))
+
+        # Fresh IDs are only handed out once every cached ID has been claimed.
+        taken_ids = set(server_by_id) | restoring_ids | deleted_ids
+        next_id = max(taken_ids | {0}) + 1
+        for order_id, client_id, client_order in pending:
+            if order_id is None:
+                order_id = next_id
+                next_id += 1
+            try:
+                restored = build_order_from_payload(client_order, order_id, today)
+            except ValueError as e:
+                rejected.append({"id": client_id, "error": str(e)})
+                continue
+            orders.append(restored)
+            if order_id != client_id:
+                id_map[str(client_id)] = order_id
+            changed = True
+
+        if changed:
+            save_orders(orders)
+
+    # Server -> client: only orders the client is missing or holds stale copies of.
+    result = get_current_schedule(today)
+    client_signatures = {}
+    for client_order in client_orders:
+        try:
+            client_signatures[int(client_order.get("id"))] = order_sync_signature(client_order)
+        except (TypeError, ValueError):
+            continue
+    for old_id, new_id in id_map.items():
+        client_signatures.pop(int(old_id), None)
+
+    server_ids = set()
+    upserts = []
+    for order in result["orders"]:
+        server_ids.add(order["id"])
+        if client_signatures.get(order["id"]) != order_sync_signature(order):
+            upserts.append(order)
+    deletes = sorted(
+        order_id for order_id in client_signatures
+        if order_id not in server_ids and str(order_id) not in id_map
+    )
+
+    return jsonify({
+        "version": result["orders_version"],
+        "upserts": upserts,
+        "deletes": deletes,
+        "id_map": id_map,
+        "rejected": rejected,
+        "changed": changed,
+    })
 
-    orders.append(order)
-    save_orders(orders)
-    return jsonify(order), 201
+
+@app.route("/quote", methods=["POST"])
+def quote_delivery_date():
+    """Quote the earliest feasible completion date for a prospective order."""
+    payload = get_json_payload()
+    if payload is None:
+        return jsonify({"error": "Request body must be a JSON object."}), 400
+
+    try:
+        qty = int(payload.get("quantity"))
+        if qty < MIN_ORDER_QUANTITY or qty > MAX_ORDER_QUANTITY:
+            raise ValueError(f"Quantity must be between {MIN_ORDER_QUANTITY} and {MAX_ORDER_QUANTITY}")
+    except (TypeError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        today = get_reference_date()
+    except ValueError:
+        return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
+
+    start_date = str(payload.get("start_date") or today.strftime("%Y-%m-%d")).strip()
+    requested_date = str(payload.get("completion_date") or "").strip()
+    try:
+        datetime.strptime(start_date, "%Y-%m-%d")
+        requested = datetime.strptime(requested_date, "%Y-%m-%d").date() if requested_date else None
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD."}), 400
+
+    line = str(payload.get("line") or DEFAULT_LINE).strip().upper()
+    if line not in PRODUCTION_LINES:
+        return jsonify({"error": "Invalid production line."}), 400
+
+    # The prospective order joins the back of the queue; nothing is persisted.
+    # Quotes queue behind deferred orders too, so they use a full-horizon schedule.
+    order = {
+        "id": "QUOTE",
+        "cabinet_type": payload.get("cabinet_type", ""),
+        "line": line,
+        "quantity": qty,
+        "start_date": start_date,
+        "completion_date": requested_date,
+    }
+    stages, completion_date = quote_order(order, get_current_schedule(today, horizon_days=None))
+    earliest = datetime.strptime(completion_date, "%Y-%m-%d").date()
+
+    return jsonify({
+        "earliest_completion_date": completion_date,
+        "requested_completion_date": requested_date or None,
+        "meets_requested_date": (earliest <= requested) if requested else None,
+        "slack_days": (requested - earliest).days if requested else None,
+        "stages": stages
+    })
 
 
 @app.route("/orders/<int:order_id>", methods=["DELETE"])
 def delete_order(order_id):
     """Delete an order."""
-    orders = load_orders()
-    orders = [o for o in orders if o["id"] != order_id]
-    save_orders(orders)
-    return jsonify({"success": True})
+    with _storage_lock:
+        orders = load_orders()
+        orders = [o for o in orders if o["id"] != order_id]
+        save_orders(orders)
+        # Remember the ID so it is never reused and sync does not bring the order back.
+        deleted_ids = load_deleted_order_ids()
+        if order_id not in deleted_ids:
+            save_deleted_order_ids(deleted_ids | {order_id})
+        return jsonify({"success": True})
 
 
 @app.route("/orders/<int:order_id>/complete-process", methods=["POST"])
 def complete_process(order_id):
     """Mark the next pending process as completed for an order."""
-    payload = request.get_json(silent=True) or {}
+    payload = get_json_payload()
+    if payload is None:
+        return jsonify({"error": "Request body must be a JSON object."}), 400
     process_name = payload.get("process")
+    try:
+        today = get_reference_date()
+    except ValueError:
+        return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
     if process_name not in PROCESS_NAMES:
         return jsonify({"error": "Invalid process name."}), 400
 
-    orders = load_orders()
-    order = next((item for item in orders if item.get("id") == order_id), None)
-    if not order:
-        return jsonify({"error": "Order not found."}), 404
+    with _storage_lock:
+        orders = load_orders()
+        order = next((item for item in orders if item.get("id") == order_id), None)
+        if not order:
+            return jsonify({"error": "Order not found."}), 404
 
-    normalize_order_state(order)
-    if order["status"] == "Completed":
-        return jsonify(order)
+        normalize_order_state(order)
+        if order["status"] == "Completed":
+            return jsonify(order)
 
-    next_process = get_next_pending_process(order.get("completed_processes", []))
-    if process_name != next_process:
-        return jsonify({"error": f"Only the current task can be completed now: {next_process}."}), 409
+        next_process = get_next_pending_process(order.get("completed_processes", []))
+        if process_name != next_process:
+            return jsonify({"error": f"Only the current task can be completed now: {next_process}."}), 409
 
-    order.setdefault("completed_processes", []).append(process_name)
-    order["active_process_progress"] = 0
-    normalize_order_state(order)
+        order.setdefault("completed_processes", []).append(process_name)
+        order["active_process_progress"] = 0
+        normalize_order_state(order)
 
-    apply_priority_settings(order, datetime.now().date())
+        apply_priority_settings(order, today)
 
-    save_orders(orders)
-    return jsonify(order)
+        save_orders(orders)
+        return jsonify(order)
 
 
 @app.route("/orders/<int:order_id>/update-process-progress", methods=["POST"])
 def update_process_progress(order_id):
     """Update partial completion percent for the current process of an order."""
-    payload = request.get_json(silent=True) or {}
+    payload = get_json_payload()
+    if payload is None:
+        return jsonify({"error": "Request body must be a JSON object."}), 400
     process_name = payload.get("process")
+    try:
+        today = get_reference_date()
+    except ValueError:
+        return jsonify({"error": "Invalid date override format. Use YYYY-MM-DD."}), 400
     percent = payload.get("percent")
 
     if process_name not in PROCESS_NAMES:
@@ -652,24 +1436,40 @@ def update_process_progress(order_id):
     if numeric_percent < 0 or numeric_percent > 99:
         return jsonify({"error": "Progress percent must be between 0 and 99."}), 400
 
-    orders = load_orders()
-    order = next((item for item in orders if item.get("id") == order_id), None)
-    if not order:
-        return jsonify({"error": "Order not found."}), 404
+    with _storage_lock:
+        orders = load_orders()
+        order = next((item for item in orders if item.get("id") == order_id), None)
+        if not order:
+            return jsonify({"error": "Order not found."}), 404
 
-    normalize_order_state(order)
-    if order["status"] == "Completed":
-        return jsonify({"error": "Order is already completed."}), 409
+        normalize_order_state(order)
+        if order["status"] == "Completed":
+            return jsonify({"error": "Order is already completed."}), 409
 
-    next_process = get_next_pending_process(order.get("completed_processes", []))
-    if process_name != next_process:
-        return jsonify({"error": f"Only the current task can be updated now: {next_process}."}), 409
+        next_process = get_next_pending_process(order.get("completed_processes", []))
+        if process_name != next_process:
+            return jsonify({"error": f"Only the current task can be updated now: {next_process}."}), 409
+
+        order["active_process_progress"] = int(round(clamp_percent(numeric_percent)))
+        normalize_order_state(order)
+        apply_priority_settings(order, today)
+        save_orders(orders)
+        return jsonify(order)
 
-    order["active_process_progress"] = int(round(clamp_percent(numeric_percent)))
-    normalize_order_state(order)
-    apply_priority_settings(order, datetime.now().date())
-    save_orders(orders)
-    return jsonify(order)
+
+@app.route("/routings", methods=["GET"])
+def get_routings():
+    """Return the process flow and each routing's processes so the frontend shares one config."""
+    return jsonify({
+        "processes": [
+            {"name": process["name"], "ratio": process["ratio"], "machine": process.get("machine")}
+            for process in ROUTING_CONFIG["processes"]
+        ],
+        "routings": {
+            name: [step["process"] for step in steps]
+            for name, steps in ROUTING_CONFIG["routings"].items()
+        },
+    })
 
 
 @app.route("/attendance", methods=["GET"])
@@ -683,7 +1483,9 @@ def get_attendance():
 @app.route("/attendance", methods=["POST"])
 def create_attendance():
     """Mark a resource absent for a specific day."""
-    payload = request.get_json(silent=True) or {}
+    payload = get_json_payload()
+    if payload is None:
+        return jsonify({"error": "Request body must be a JSON object."}), 400
     date_str = str(payload.get("date", "")).strip()
     resource = str(payload.get("resource", "")).strip().upper()
     reason = str(payload.get("reason", "")).strip()
@@ -698,32 +1500,34 @@ def create_attendance():
     if resource not in RESOURCE_ROLE_MAP:
         return jsonify({"error": "Invalid resource ID."}), 400
 
-    records = load_attendance()
-    if any(item.get("date") == date_str and str(item.get("resource", "")).upper() == resource for item in records):
-        return jsonify({"error": "This resource is already marked absent on that date."}), 409
-
-    next_id = max([int(item.get("id", 0)) for item in records] + [0]) + 1
-    record = {
-        "id": next_id,
-        "date": date_str,
-        "resource": resource,
-        "role": RESOURCE_ROLE_MAP[resource],
-        "reason": reason,
-    }
-    records.append(record)
-    save_attendance(records)
-    return jsonify(record), 201
+    with _storage_lock:
+        records = load_attendance()
+        if any(item.get("date") == date_str and str(item.get("resource", "")).upper() == resource for item in records):
+            return jsonify({"error": "This resource is already marked absent on that date."}), 409
+
+        next_id = max([int(item.get("id", 0)) for item in records] + [0]) + 1
+        record = {
+            "id": next_id,
+            "date": date_str,
+            "resource": resource,
+            "role": RESOURCE_ROLE_MAP[resource],
+            "reason": reason,
+        }
+        records.append(record)
+        save_attendance(records)
+        return jsonify(record), 201
 
 
 @app.route("/attendance/<int:record_id>", methods=["DELETE"])
 def delete_attendance(record_id):
     """Delete an attendance absence record by ID."""
-    records = load_attendance()
-    filtered = [item for item in records if int(item.get("id", 0)) != record_id]
-    if len(filtered) == len(records):
-        return jsonify({"error": "Attendance record not found."}), 404
-    save_attendance(filtered)
-    return jsonify({"success": True})
+    with _storage_lock:
+        records = load_attendance()
+        filtered = [item for item in records if int(item.get("id", 0)) != record_id]
+        if len(filtered) == len(records):
+            return jsonify({"error": "Attendance record not found."}), 404
+        save_attendance(filtered)
+        return jsonify({"success": True})
 
 
 if __name__ == "__main__":
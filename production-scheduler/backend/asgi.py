@@ -0,0 +1,16 @@
+"""ASGI entry point for serving the Flask routes asynchronously.
+
+Run with: uvicorn asgi:asgi_app --app-dir backend --port 5000
+"""
+
+import os
+
+from a2wsgi import WSGIMiddleware
+
+import app as scheduler
+
+# Large schedules run in worker processes so request threads stay free for reads.
+scheduler.SCHEDULE_IN_PROCESS = True
+
+# Each request runs on a thread pool instead of blocking the event loop.
+asgi_app = WSGIMiddleware(scheduler.app, workers=int(os.environ.get("ASGI_WORKERS", 32)))
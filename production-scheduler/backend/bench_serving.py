@@ -0,0 +1,128 @@
+"""Compare read latency under concurrent load for the Flask and ASGI servers.
+
+Each run polls GET /orders from a number of concurrent clients while one
+client keeps writing attendance records. Data files are copied to a temporary
+directory, so the real orders.json and attendance.json are never touched.
+
+Usage: python backend/bench_serving.py [--requests 400] [--concurrency 1 8 32 64]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVERS = {
+    "flask": [sys.executable, "app.py"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi:asgi_app", "--log-level", "warning", "--port"],
+}
+
+
+def free_port():
+    """Ask the OS for an unused local port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(name, data_dir):
+    """Start one server in a subprocess and wait until it accepts connections."""
+    port = free_port()
+    command = SERVERS[name] + ([str(port)] if name == "asgi" else [])
+    env = dict(os.environ, PORT=str(port), DATA_DIR=data_dir)
+    process = subprocess.Popen(command, cwd=BASE_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f"{name} server did not start")
+
+
+def timed_get(url):
+    """Return request latency in seconds, or None on failure."""
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            response.read()
+    except OSError:
+        return None
+    return time.perf_counter() - started
+
+
+def keep_writing(base_url, stop):
+    """Create and delete attendance records until told to stop."""
+    body = json.dumps({"date": "2099-01-01", "resource": "NSH8", "reason": "bench"}).encode()
+    while not stop.is_set():
+        request = urllib.request.Request(f"{base_url}/attendance", data=body, method="POST",
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                record_id = json.load(response)["id"]
+            delete = urllib.request.Request(f"{base_url}/attendance/{record_id}", method="DELETE")
+            urllib.request.urlopen(delete, timeout=30).read()
+        except OSError:
+            pass
+
+
+def run_load(base_url, concurrency, total_requests):
+    """Poll /orders with a fixed number of clients while a writer runs."""
+    stop = threading.Event()
+    writer = threading.Thread(target=keep_writing, args=(base_url, stop), daemon=True)
+    writer.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed_get, [f"{base_url}/orders"] * total_requests))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    writer.join()
+
+    ok = sorted(value for value in latencies if value is not None)
+    p95 = ok[int(len(ok) * 0.95) - 1] if ok else float("nan")
+    return {
+        "rps": len(ok) / elapsed,
+        "p50_ms": statistics.median(ok) * 1000 if ok else float("nan"),
+        "p95_ms": p95 * 1000,
+        "errors": len(latencies) - len(ok),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 64])
+    args = parser.parse_args()
+
+    print(f"{'server':<8}{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'errors':>8}")
+    for name in SERVERS:
+        data_dir = tempfile.mkdtemp(prefix="ps-bench-")
+        for filename in ("orders.json", "attendance.json"):
+            shutil.copy(os.path.join(BASE_DIR, filename), data_dir)
+        process, base_url = start_server(name, data_dir)
+        try:
+            for concurrency in args.concurrency:
+                result = run_load(base_url, concurrency, args.requests)
+                print(f"{name:<8}{concurrency:>8}{result['rps']:>10.1f}{result['p50_ms']:>10.1f}"
+                      f"{result['p95_ms']:>10.1f}{result['errors']:>8}")
+        finally:
+            process.terminate()
+            process.wait()
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+import pytest
+
+import app as scheduler
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Flask test client backed by empty data files in a temporary directory."""
+    monkeypatch.setattr(scheduler, "ORDERS_FILE", str(tmp_path / "orders.json"))
+    monkeypatch.setattr(scheduler, "ATTENDANCE_FILE", str(tmp_path / "attendance.json"))
+    monkeypatch.setattr(scheduler, "DELETED_ORDERS_FILE", str(tmp_path / "deleted_orders.json"))
+    return scheduler.app.test_client()
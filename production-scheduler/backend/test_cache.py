@@ -0,0 +1,66 @@
+import copy
+from collections import OrderedDict
+from datetime import date
+
+import pytest
+
+import app as scheduler
+
+ORDERS = [
+    {
+        "id": 1, "customer_name": "Santos", "cabinet_type": "Shelves", "color": "Oak", "quantity": 5,
+        "start_date": "2026-03-05", "completion_date": "2026-03-01", "status": "In Progress",
+        "completed_processes": [], "active_process_progress": 0,
+    },
+    {
+        "id": 2, "customer_name": "Reyes", "cabinet_type": "Tall Cabinet", "color": "White", "quantity": 10,
+        "start_date": "2026-03-01", "completion_date": "2026-05-30", "status": "In Progress",
+        "completed_processes": ["CNC Cutting"], "active_process_progress": 40,
+    },
+]
+ATTENDANCE = [{"id": 1, "date": "2026-03-02", "resource": "MO1", "role": "Machine Operator"}]
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(scheduler, "_schedule_cache", OrderedDict())
+
+
+def test_compute_schedule_does_not_modify_its_inputs():
+    orders = copy.deepcopy(ORDERS)
+    attendance = copy.deepcopy(ATTENDANCE)
+
+    result = scheduler.compute_schedule(orders, attendance, date(2026, 3, 1))
+
+    assert orders == ORDERS and attendance == ATTENDANCE
+    # Order 1 finishes before it starts, so the prepared copy is repaired instead.
+    assert result["orders_changed"]
+    assert result["orders"][0]["start_date"] == "2026-03-01"
+
+
+def test_get_schedule_reuses_results_for_identical_inputs():
+    first = scheduler.get_schedule(copy.deepcopy(ORDERS), ATTENDANCE, date(2026, 3, 1))
+    second = scheduler.get_schedule(copy.deepcopy(ORDERS), ATTENDANCE, date(2026, 3, 1))
+
+    assert second is first
+
+
+def test_cache_key_includes_date_horizon_and_data():
+    base = scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 1))
+
+    assert scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 2)) is not base
+    assert scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 1), horizon_days=None) is not base
+    assert scheduler.get_schedule(ORDERS, [], date(2026, 3, 1)) is not base
+    assert scheduler.get_schedule(ORDERS[:1], ATTENDANCE, date(2026, 3, 1)) is not base
+    assert scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 1)) is base
+
+
+def test_cache_evicts_least_recently_used(monkeypatch):
+    monkeypatch.setattr(scheduler, "SCHEDULE_CACHE_SIZE", 2)
+    first = scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 1))
+    scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 2))
+    scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 1))
+    scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 3))
+
+    assert scheduler.get_schedule(ORDERS, ATTENDANCE, date(2026, 3, 1)) is first
+    assert len(scheduler._schedule_cache) == 2
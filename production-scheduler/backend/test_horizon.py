@@ -0,0 +1,67 @@
+from datetime import date, timedelta
+
+import app as scheduler
+
+TODAY = date(2026, 3, 2)  # a Monday, so the horizon ends on a week boundary
+
+
+def order(order_id, completion_date, status="In Progress", **fields):
+    return dict({
+        "id": order_id, "customer_name": f"C{order_id}", "cabinet_type": "Tall Cabinet", "color": "Oak",
+        "quantity": 5, "start_date": "2026-03-01", "completion_date": completion_date, "status": status,
+        "completed_processes": [], "active_process_progress": 0,
+    }, **fields)
+
+
+def stage_days(item):
+    return sum(stage.days for stage in scheduler.get_remaining_stage_plan(item))
+
+
+def test_horizon_defers_far_low_priority_orders_until_they_come_due():
+    orders = [order(1, "2026-03-06"), order(2, "2026-06-30"), order(
+        3, "2026-07-30", status="Completed", completed_processes=scheduler.PROCESS_NAMES[:], active_process_progress=100
+    )]
+
+    result = scheduler.compute_schedule(orders, [], TODAY)
+
+    assert result["rough_cut"]["deferred"] == [2]
+    assert result["schedule"]["2"] == {}
+    assert result["schedule"]["1"]
+    # Completed orders are LOW priority too, but are never waiting.
+    assert 3 not in result["rough_cut"]["deferred"]
+
+    # Once its latest possible start falls inside the window, the order is scheduled in detail.
+    latest_start = date(2026, 6, 30) - timedelta(days=stage_days(result["orders"][1]))
+    later = scheduler.compute_schedule(orders, [], latest_start - timedelta(days=13))
+    assert later["rough_cut"]["deferred"] == []
+    assert later["schedule"]["2"]
+
+
+def test_horizon_buckets_compare_weekly_load_with_capacity():
+    far = order(1, "2026-06-29")
+    attendance = [{"id": 1, "date": "2026-06-22", "resource": "NSH1", "role": "Non-Skilled Helper"}]
+
+    result = scheduler.compute_schedule([far], attendance, TODAY)
+    buckets = result["rough_cut"]["buckets"]
+
+    # Back-scheduled load adds up to the remaining plan's worker-days, split by week.
+    plan = scheduler.get_remaining_stage_plan(result["orders"][0])
+    expected = sum(count * stage.days for stage in plan for _, count in stage.team or ((stage.worker_type, 1),))
+    assert sum(bucket["load_days"] for bucket in buckets) == expected
+    assert all(bucket["orders"] == [1] and bucket["week_start"] >= "2026-03-16" for bucket in buckets)
+
+    helpers = sum(1 for entry in scheduler.RESOURCE_CATALOG if entry["role"] == "Non-Skilled Helper")
+    helper_week = next(b for b in buckets if b["role"] == "Helper" and b["week_start"] == "2026-06-22")
+    assert helper_week["capacity_days"] == helpers * 7 - 1
+    assert helper_week["overloaded"] == (helper_week["load_days"] > helper_week["capacity_days"])
+
+
+def test_quote_queues_behind_deferred_orders(client):
+    body = {"cabinet_type": "Tall Cabinet", "quantity": 10}
+    empty = client.post("/quote?date=2026-03-02", json=body).get_json()
+    client.post("/orders?date=2026-03-02", json=order(None, "2026-06-30", quantity=10))
+
+    quote = client.post("/quote?date=2026-03-02", json=body).get_json()
+
+    assert client.get("/orders?date=2026-03-02").get_json()["rough_cut"]["deferred"] == [1]
+    assert quote["earliest_completion_date"] > empty["earliest_completion_date"]
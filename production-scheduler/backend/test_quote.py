@@ -0,0 +1,48 @@
+import app as scheduler
+
+ORDER = {
+    "customer_name": "Santos",
+    "cabinet_type": "Tall Cabinet",
+    "color": "Oak",
+    "quantity": 10,
+    "start_date": "2026-03-01",
+    "completion_date": "2026-03-20",
+}
+
+
+def post_quote(client, body):
+    return client.post("/quote?date=2026-03-01", json=body)
+
+
+def test_quote_stages_follow_the_routing_order(client):
+    quote = post_quote(client, {"cabinet_type": "Shelves", "quantity": 5}).get_json()
+
+    # Shelves skip CNC Routing; JSON keys come back sorted, so restore the routing order.
+    names = ["CNC Cutting", "CNC Edging", "Assembly", "Quality Assurance", "Packing"]
+    assert sorted(quote["stages"]) == sorted(names)
+    stages = [quote["stages"][name] for name in names]
+    for previous, stage in zip(stages, stages[1:]):
+        assert stage["start"] >= previous["end"]
+    assert quote["earliest_completion_date"] == stages[-1]["end"]
+
+
+def test_quote_queues_behind_existing_orders_without_saving(client):
+    empty = post_quote(client, {"cabinet_type": "Tall Cabinet", "quantity": 10}).get_json()
+    client.post("/orders?date=2026-03-01", json=ORDER)
+
+    busy = post_quote(client, {"cabinet_type": "Tall Cabinet", "quantity": 10}).get_json()
+
+    assert busy["earliest_completion_date"] > empty["earliest_completion_date"]
+    assert len(scheduler.load_orders()) == 1
+
+
+def test_quote_reports_slack_against_requested_date(client):
+    quote = post_quote(client, {"quantity": 5, "completion_date": "2026-06-01"}).get_json()
+
+    assert quote["meets_requested_date"] is True
+    assert quote["slack_days"] > 0
+
+
+def test_quote_rejects_non_object_body(client):
+    assert post_quote(client, [1, 2]).status_code == 400
+    assert client.post("/sync", json=[1, 2]).status_code == 400
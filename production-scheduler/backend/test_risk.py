@@ -0,0 +1,52 @@
+from datetime import date
+
+import app as scheduler
+
+TODAY = date(2026, 3, 1)
+
+
+def stage(start, end, worker, machine="N/A"):
+    days = (date.fromisoformat(end) - date.fromisoformat(start)).days
+    return {"start": start, "end": end, "days": days, "worker": worker, "machine": machine}
+
+
+def test_risk_reports_slack_and_critical_stage():
+    orders = [
+        {"id": 1, "completion_date": "2026-03-20", "status": "In Progress"},
+        {"id": 2, "completion_date": "2026-03-06", "status": "In Progress"},
+        {"id": 3, "completion_date": "2026-03-02", "status": "Completed"},
+    ]
+    schedule = {
+        "1": {"CNC Cutting": stage("2026-03-01", "2026-03-03", "MO1", "MO1")},
+        "2": {
+            "CNC Cutting": stage("2026-03-03", "2026-03-05", "MO1", "MO1"),
+            "Packing": stage("2026-03-05", "2026-03-08", "H1"),
+        },
+        "3": {"Packing": stage("2026-03-01", "2026-03-02", "H1")},
+    }
+
+    risk = scheduler.calculate_risk_analytics(orders, schedule, TODAY)
+
+    rows = {row["id"]: row for row in risk["orders"]}
+    assert set(rows) == {1, 2}
+    assert rows[1]["slack_days"] == 17 and not rows[1]["at_risk"]
+    assert rows[2]["slack_days"] == -2 and rows[2]["late"] and rows[2]["at_risk"]
+    assert rows[2]["critical_stage"] == "Packing"
+    assert risk["orders"][0]["id"] == 2
+    assert risk["summary"] == {
+        "open_orders": 2, "late": 1, "at_risk": 1, "deferred": 0, "overloaded_buckets": 0,
+    }
+
+
+def test_bottlenecks_list_operator_and_machine_once():
+    orders = [{"id": 1, "completion_date": "2026-03-20", "status": "In Progress"}]
+    schedule = {"1": {
+        "CNC Cutting": stage("2026-03-01", "2026-03-05", "MO1", "MO1"),
+        "CNC Edging": stage("2026-03-05", "2026-03-08", "MO2", "MO2"),
+        "Packing": stage("2026-03-08", "2026-03-09", "H1"),
+    }}
+
+    risk = scheduler.calculate_risk_analytics(orders, schedule, TODAY)
+
+    assert [item["id"] for item in risk["bottlenecks"]] == ["MO1", "MO2", "H1"]
+    assert {(row["id"], row["kind"]) for row in risk["resources"]} >= {("MO1", "worker"), ("MO1", "machine")}
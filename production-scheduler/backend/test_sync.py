@@ -0,0 +1,97 @@
+import app as scheduler
+
+ORDER = {
+    "customer_name": "Santos",
+    "cabinet_type": "Tall Cabinet",
+    "color": "Oak",
+    "quantity": 5,
+    "start_date": "2026-03-01",
+    "completion_date": "2026-03-20",
+}
+
+
+def delete_entry(order):
+    return {"id": order["id"], "signature": scheduler.order_identity_signature(order)}
+
+
+def post_sync(client, body):
+    response = client.post("/sync?date=2026-03-01", json=body)
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_sync_restores_lost_order_under_its_id(client):
+    body = {"version": None, "orders": [dict(ORDER, id=4)], "deletes": []}
+
+    first = post_sync(client, body)
+    second = post_sync(client, body)
+
+    assert first["changed"] and not second["changed"]
+    assert [order["id"] for order in scheduler.load_orders()] == [4]
+    assert second["upserts"] == first["upserts"] and second["deletes"] == []
+
+
+def test_sync_repeated_collision_reuses_restored_id(client):
+    # The server lost the client's order 1 and gave ID 1 to a different order.
+    client.post("/orders?date=2026-03-01", json=dict(ORDER, customer_name="Reyes"))
+    body = {"version": None, "orders": [dict(ORDER, id=1)], "deletes": []}
+
+    first = post_sync(client, body)
+    count = len(scheduler.load_orders())
+    second = post_sync(client, body)
+
+    assert first["id_map"] == {"1": 2}
+    assert second["id_map"] == first["id_map"]
+    assert len(scheduler.load_orders()) == count == 2
+    assert not second["changed"]
+
+
+def test_sync_offline_delete_is_never_restored(client):
+    created = client.post("/orders?date=2026-03-01", json=ORDER).get_json()
+    body = {"version": None, "orders": [created], "deletes": [delete_entry(created)]}
+
+    post_sync(client, body)
+    result = post_sync(client, body)
+
+    assert scheduler.load_orders() == []
+    assert result["deletes"] == [created["id"]]
+    assert client.post("/orders?date=2026-03-01", json=ORDER).get_json()["id"] == created["id"] + 1
+
+
+def test_sync_retried_collision_with_several_orders_is_stable(client):
+    # The server lost everything and another client created order 1 since.
+    client.post("/orders?date=2026-03-01", json=dict(ORDER, customer_name="Other"))
+    cached = [dict(ORDER, id=order_id, customer_name=f"A{order_id}") for order_id in (1, 2, 3)]
+    body = {"version": None, "orders": cached, "deletes": []}
+
+    first = post_sync(client, body)
+    stored = sorted((order["id"], order["customer_name"]) for order in scheduler.load_orders())
+    second = post_sync(client, body)
+
+    # Orders 2 and 3 keep their IDs; only the colliding order 1 moves.
+    assert first["id_map"] == {"1": 4}
+    assert stored == [(1, "Other"), (2, "A2"), (3, "A3"), (4, "A1")]
+    assert second["id_map"] == first["id_map"]
+    assert sorted((order["id"], order["customer_name"]) for order in scheduler.load_orders()) == stored
+    assert not second["changed"]
+
+
+def test_sync_stale_delete_keeps_order_that_reused_the_id(client):
+    mine = dict(ORDER, id=1, customer_name="Mine")
+    client.post("/orders?date=2026-03-01", json=dict(ORDER, customer_name="Other"))
+
+    result = post_sync(client, {"version": None, "orders": [], "deletes": [delete_entry(mine)]})
+
+    assert [order["customer_name"] for order in scheduler.load_orders()] == ["Other"]
+    assert not result["changed"]
+    assert scheduler.load_deleted_order_ids() == set()
+
+
+def test_sync_ignores_deletes_of_ids_never_handed_out(client):
+    client.post("/orders?date=2026-03-01", json=ORDER)
+    unknown = dict(ORDER, id=10 ** 15)
+
+    post_sync(client, {"version": None, "orders": [], "deletes": [delete_entry(unknown)]})
+
+    assert scheduler.load_deleted_order_ids() == set()
+    assert client.post("/orders?date=2026-03-01", json=ORDER).get_json()["id"] == 2
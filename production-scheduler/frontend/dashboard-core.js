@@ -0,0 +1,385 @@
+// Dashboard calculations shared by the page and the dashboard Web Worker.
+// Everything here is DOM-free so it can run with importScripts().
+
+// Demo reference date (YYYY-MM-DD) used for date-based progress; empty means today.
+let progressReferenceDate = "";
+
+// Process flow and routings are loaded from the backend's routings.json (GET /routings).
+const PROCESS_COLORS = ["#7B542F", "#B6771D", "#FF9D00", "#FFCF71", "#B6771D", "#7B542F"];
+let PROCESS_FLOW = [];
+let PROCESS_ROUTINGS = {};
+let PROCESS_STAGE_RANGES = [];
+let PROCESS_STAGE_MAP = {};
+
+function setProcessConfig(config) {
+  const processes = Array.isArray(config?.processes) ? config.processes : [];
+  PROCESS_FLOW = processes.map((process, index) => ({
+    name: process.name,
+    ratio: Number(process.ratio) || 0,
+    color: PROCESS_COLORS[index % PROCESS_COLORS.length],
+    machine: process.machine || "N/A",
+  }));
+  PROCESS_ROUTINGS = config?.routings && typeof config.routings === "object" ? config.routings : {};
+
+  let cursor = 0;
+  PROCESS_STAGE_RANGES = PROCESS_FLOW.map((process) => {
+    const start = cursor;
+    const end = cursor + process.ratio;
+    cursor = end;
+    return { name: process.name, start, end };
+  });
+  PROCESS_STAGE_MAP = PROCESS_STAGE_RANGES.reduce((acc, stage) => {
+    acc[stage.name] = stage;
+    return acc;
+  }, {});
+}
+
+// Processes an order's cabinet type actually runs, matching the backend's resolve_routing.
+function getOrderProcessFlow(order) {
+  const cabinetType = String(order?.cabinet_type || "").trim().toLowerCase();
+  const routingName =
+    Object.keys(PROCESS_ROUTINGS).find((name) => name.trim().toLowerCase() === cabinetType) || "default";
+  const steps = new Set(PROCESS_ROUTINGS[routingName] || []);
+  return steps.size ? PROCESS_FLOW.filter((process) => steps.has(process.name)) : PROCESS_FLOW;
+}
+
+function parseDate(value) {
+  if (!value) {
+    return null;
+  }
+  const date = new Date(value);
+  if (Number.isNaN(date.getTime())) {
+    return null;
+  }
+  date.setHours(0, 0, 0, 0);
+  return date;
+}
+
+function getProcessRange(processName) {
+  return PROCESS_STAGE_MAP[processName] || null;
+}
+
+function getCompletedProcessList(order) {
+  if (!Array.isArray(order?.completed_processes)) {
+    return [];
+  }
+
+  const allowed = new Set(PROCESS_FLOW.map((process) => process.name));
+  return order.completed_processes.filter((name, index, array) => (
+    allowed.has(name) && array.indexOf(name) === index
+  ));
+}
+
+function getNextPendingProcess(order) {
+  const completedSet = new Set(getCompletedProcessList(order));
+  const next = PROCESS_FLOW.find((process) => !completedSet.has(process.name));
+  return next ? next.name : null;
+}
+
+function getCompletedStageProgress(order) {
+  const completedSet = new Set(getCompletedProcessList(order));
+  let progress = 0;
+  for (const process of PROCESS_FLOW) {
+    if (completedSet.has(process.name)) {
+      progress += process.ratio;
+    } else {
+      break;
+    }
+  }
+  return progress;
+}
+
+function getProgressSnapshot(order) {
+  if (isStatusCompleted(order)) {
+    return {
+      normalizedProgress: 100,
+      activeProcessPercent: 100,
+      nextProcessName: null,
+      completedProgress: 100,
+    };
+  }
+
+  const completedProgress = getCompletedStageProgress(order);
+  const nextProcessName = getNextPendingProcess(order);
+  const nextProcess = PROCESS_FLOW.find((process) => process.name === nextProcessName) || null;
+  if (!nextProcess) {
+    return {
+      normalizedProgress: 100,
+      activeProcessPercent: 100,
+      nextProcessName: null,
+      completedProgress: 100,
+    };
+  }
+
+  const dateProgress = calculateDateProgress(order);
+  const stageEnd = completedProgress + nextProcess.ratio;
+  const stageCap = stageEnd >= 100 ? 99 : stageEnd;
+  const projected = dateProgress === null ? completedProgress : dateProgress;
+  const normalizedProgress = Math.max(completedProgress, Math.min(stageCap, projected));
+
+  const ratio = nextProcess.ratio > 0 ? nextProcess.ratio : 1;
+  const activeProcessPercent = Math.max(
+    0,
+    Math.min(99, ((normalizedProgress - completedProgress) / ratio) * 100)
+  );
+
+  return {
+    normalizedProgress,
+    activeProcessPercent,
+    nextProcessName,
+    completedProgress,
+  };
+}
+
+function getActiveProcessProgress(order) {
+  return Math.round(getProgressSnapshot(order).activeProcessPercent);
+}
+
+function getProcessProgressPercent(orderProgress, processName) {
+  const stage = getProcessRange(processName);
+  if (!stage) {
+    return 0;
+  }
+
+  const progress = Number(orderProgress) || 0;
+  if (progress <= stage.start) {
+    return 0;
+  }
+  if (progress >= stage.end) {
+    return 100;
+  }
+
+  const span = stage.end - stage.start;
+  if (span <= 0) {
+    return 0;
+  }
+  return ((progress - stage.start) / span) * 100;
+}
+
+function isStatusCompleted(order) {
+  return String(order?.status || "").toLowerCase() === "completed";
+}
+
+function calculateDateProgress(order) {
+  const start = parseDate(order?.start_date);
+  const end = parseDate(order?.completion_date);
+  if (!start || !end) {
+    return null;
+  }
+
+  const referenceDate = parseDate(progressReferenceDate) || parseDate(new Date());
+  const msPerDay = 1000 * 60 * 60 * 24;
+  const totalDays = Math.floor((end - start) / msPerDay);
+  const elapsedDays = Math.floor((referenceDate - start) / msPerDay);
+
+  if (elapsedDays >= totalDays) {
+    return 100;
+  }
+  if (elapsedDays <= 0) {
+    return 0;
+  }
+  if (totalDays <= 0) {
+    return 100;
+  }
+  return Math.min(100, (100 / totalDays) * elapsedDays);
+}
+
+function isCompleted(order) {
+  return isStatusCompleted(order) || getNormalizedProgress(order) >= 100;
+}
+
+function getNormalizedProgress(order) {
+  return getProgressSnapshot(order).normalizedProgress;
+}
+
+function getEffectivePriority(order) {
+  if (isCompleted(order)) {
+    return "LOW";
+  }
+  const priority = String(order.priority || "LOW").toUpperCase();
+  if (priority === "HIGH" || priority === "MEDIUM" || priority === "LOW") {
+    return priority;
+  }
+  return "LOW";
+}
+
+function getOrderSignature(order) {
+  return [
+    String(order?.customer_name || "").trim().toLowerCase(),
+    String(order?.cabinet_type || "").trim().toLowerCase(),
+    String(order?.color || "").trim().toLowerCase(),
+    String(Number(order?.quantity) || 0),
+    String(order?.completion_date || ""),
+  ].join("|");
+}
+
+function getUpcomingDeadlineOrders(orders) {
+  return [...orders]
+    .filter((order) => !isCompleted(order))
+    .filter((order) => parseDate(order.completion_date))
+    .sort((a, b) => parseDate(a.completion_date) - parseDate(b.completion_date));
+}
+
+function calculateStageUtilizations(orders) {
+  const totalWeight = orders.reduce(
+    (sum, order) => sum + (Number(order.quantity) || 1),
+    0
+  );
+  const safeWeight = totalWeight || 1;
+
+  const getStageProgressForOrder = (order, processName) => {
+    if (isStatusCompleted(order)) {
+      return 100;
+    }
+
+    const completedSet = new Set(getCompletedProcessList(order));
+    if (completedSet.has(processName)) {
+      return 100;
+    }
+
+    const nextProcessName = getNextPendingProcess(order);
+    if (nextProcessName === processName) {
+      return getActiveProcessProgress(order);
+    }
+
+    return 0;
+  };
+
+  return PROCESS_FLOW.map((process) => {
+    const weightedProgress = orders.reduce((sum, order) => {
+      const weight = Number(order.quantity) || 1;
+      const processProgress = getStageProgressForOrder(order, process.name);
+      return sum + processProgress * weight;
+    }, 0);
+
+    const utilization = Math.round(weightedProgress / safeWeight);
+    return {
+      name: process.name,
+      utilization: Math.max(0, Math.min(100, utilization)),
+    };
+  });
+}
+
+function calculateStageRemainingLoads(orders) {
+  const stageLoads = PROCESS_FLOW.map((process) => ({
+    name: process.name,
+    load: 0,
+  }));
+
+  orders.forEach((order) => {
+    const weight = Number(order.quantity) || 1;
+    const progress = getNormalizedProgress(order);
+
+    PROCESS_FLOW.forEach((process, index) => {
+      const stage = getProcessRange(process.name);
+      if (!stage) {
+        return;
+      }
+
+      let remainingPercent = 0;
+      if (progress <= stage.start) {
+        remainingPercent = process.ratio;
+      } else if (progress >= stage.end) {
+        remainingPercent = 0;
+      } else {
+        remainingPercent = stage.end - progress;
+      }
+
+      stageLoads[index].load += remainingPercent * weight;
+    });
+  });
+
+  const totalLoad = stageLoads.reduce((sum, stage) => sum + stage.load, 0) || 1;
+  return stageLoads.map((stage) => ({
+    ...stage,
+    share: Math.round((stage.load / totalLoad) * 100),
+  }));
+}
+
+function setProgressReferenceDate(value) {
+  progressReferenceDate = String(value || "");
+}
+
+function computeDashboardModel(orders) {
+  const today = new Date();
+  today.setHours(0, 0, 0, 0);
+  const msPerDay = 1000 * 60 * 60 * 24;
+
+  const totalOrders = orders.length;
+  const completedOrders = orders.filter(isCompleted).length;
+  const activeOrders = totalOrders - completedOrders;
+
+  const dueSoon = orders.filter((order) => {
+    if (isCompleted(order)) {
+      return false;
+    }
+    const endDate = parseDate(order.completion_date);
+    if (!endDate) {
+      return false;
+    }
+    const daysUntilDue = Math.floor((endDate - today) / msPerDay);
+    return daysUntilDue >= 0 && daysUntilDue <= 7;
+  }).length;
+
+  const activeOrdersOnly = orders.filter((order) => !isCompleted(order));
+  const totalUnits = orders.reduce((sum, order) => sum + (Number(order.quantity) || 0), 0);
+  const wipUnits = activeOrdersOnly.reduce((sum, order) => sum + (Number(order.quantity) || 0), 0);
+
+  const priorityCounts = { HIGH: 0, MEDIUM: 0, LOW: 0 };
+  activeOrdersOnly.forEach((order) => {
+    const priority = getEffectivePriority(order);
+    if (priorityCounts[priority] !== undefined) {
+      priorityCounts[priority] += 1;
+    } else {
+      priorityCounts.LOW += 1;
+    }
+  });
+
+  const priorityTotal = activeOrdersOnly.length || 1;
+  const priorityRows = [
+    {
+      label: "High",
+      count: priorityCounts.HIGH,
+      percent: Math.round((priorityCounts.HIGH / priorityTotal) * 100),
+      color: "#FF9D00",
+    },
+    {
+      label: "Medium",
+      count: priorityCounts.MEDIUM,
+      percent: Math.round((priorityCounts.MEDIUM / priorityTotal) * 100),
+      color: "#B6771D",
+    },
+    {
+      label: "Low",
+      count: priorityCounts.LOW,
+      percent: Math.round((priorityCounts.LOW / priorityTotal) * 100),
+      color: "#7B542F",
+    },
+  ];
+
+  const typeCounts = {};
+  orders.forEach((order) => {
+    const type = order.cabinet_type || "Unspecified";
+    typeCounts[type] = (typeCounts[type] || 0) + 1;
+  });
+
+  const typeTotal = totalOrders || 1;
+  const palette = ["#7B542F", "#B6771D", "#FF9D00", "#9c8064"];
+  const typeRows = Object.entries(typeCounts)
+    .sort((a, b) => b[1] - a[1])
+    .map(([label, count], index) => ({
+      label,
+      count,
+      percent: Math.round((count / typeTotal) * 100),
+      color: palette[index % palette.length],
+    }));
+
+  return {
+    stats: { totalOrders, activeOrders, completedOrders, dueSoon, totalUnits, wipUnits },
+    priorityRows,
+    typeRows,
+    upcomingDeadlines: getUpcomingDeadlineOrders(orders),
+    stageUtilizations: calculateStageUtilizations(orders),
+    stageRemainingLoads: calculateStageRemainingLoads(orders),
+  };
+}
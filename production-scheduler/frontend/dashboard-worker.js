@@ -0,0 +1,9 @@
+// Computes dashboard aggregates off the main thread.
+importScripts("dashboard-core.js");
+
+self.addEventListener("message", (event) => {
+  const { requestId, orders, referenceDate, processConfig } = event.data || {};
+  setProgressReferenceDate(referenceDate);
+  setProcessConfig(processConfig);
+  self.postMessage({ requestId, model: computeDashboardModel(Array.isArray(orders) ? orders : []) });
+});
@@ -14,29 +14,19 @@ let ordersTablePage = 1;
 let globalAttendance = [];
 let attendanceResources = [];
 const LOCAL_ORDERS_CACHE_KEY = "ps_orders_cache_v1";
-let isRestoringFromCache = false;
-let isReconcilingFromCache = false;
-const PROCESS_FLOW = [
-  { name: "CNC Cutting", ratio: 15, color: "#7B542F", machine: "MO1" },
-  { name: "CNC Edging", ratio: 15, color: "#B6771D", machine: "MO2" },
-  { name: "CNC Routing", ratio: 15, color: "#FF9D00", machine: "MO3" },
-  { name: "Assembly", ratio: 40, color: "#FFCF71", machine: "N/A" },
-  { name: "Quality Assurance", ratio: 5, color: "#B6771D", machine: "N/A" },
-  { name: "Packing", ratio: 10, color: "#7B542F", machine: "N/A" },
-];
-const PROCESS_STAGE_RANGES = (() => {
-  let cursor = 0;
-  return PROCESS_FLOW.map((process) => {
-    const start = cursor;
-    const end = cursor + process.ratio;
-    cursor = end;
-    return { name: process.name, start, end };
-  });
-})();
-const PROCESS_STAGE_MAP = PROCESS_STAGE_RANGES.reduce((acc, stage) => {
-  acc[stage.name] = stage;
-  return acc;
-}, {});
+const LOCAL_SYNC_STATE_KEY = "ps_sync_state_v1";
+const LOCAL_PROCESS_CONFIG_KEY = "ps_process_config_v1";
+let processConfig = null;
+let isSyncingWithBackend = false;
+let needsBackendSync = true;
+let globalDeadlineOrders = [];
+let dashboardWorker = null;
+let dashboardRequestId = 0;
+const dashboardRequests = new Map();
+// Tables larger than this only keep the rows near the viewport in the DOM.
+const VIRTUAL_ROW_THRESHOLD = 60;
+const VIRTUAL_OVERSCAN_ROWS = 10;
+const ATTENDANCE_ROW_HEIGHT = 57;
 
 const orderForm = document.getElementById("orderForm");
 const ordersTable = document.getElementById("ordersTable");
@@ -72,6 +62,7 @@ const attendanceDateInput = document.getElementById("attendanceDate");
 const attendanceResourceSelect = document.getElementById("attendanceResource");
 const attendanceReasonInput = document.getElementById("attendanceReason");
 const attendanceTable = document.getElementById("attendanceTable");
+const attendanceViewport = document.getElementById("attendanceViewport");
 const machineUtilizationSection = document.getElementById("machineUtilizationSection");
 const machineUtilizationList = document.getElementById("machineUtilizationList");
 const WORKDAY_START_MINUTES = 8 * 60; // 08:00
@@ -82,18 +73,6 @@ const WORKDAY_MORNING_MINUTES = WORKDAY_LUNCH_START_MINUTES - WORKDAY_START_MINU
 const WORKDAY_AFTERNOON_MINUTES = WORKDAY_END_MINUTES - WORKDAY_LUNCH_END_MINUTES; // 3 hours
 const WORKDAY_MINUTES = WORKDAY_MORNING_MINUTES + WORKDAY_AFTERNOON_MINUTES; // 7 productive hours
 
-function parseDate(value) {
-  if (!value) {
-    return null;
-  }
-  const date = new Date(value);
-  if (Number.isNaN(date.getTime())) {
-    return null;
-  }
-  date.setHours(0, 0, 0, 0);
-  return date;
-}
-
 function getLocalDateISO() {
   const now = new Date();
   const year = now.getFullYear();
@@ -102,6 +81,92 @@ function getLocalDateISO() {
   return `${year}-${month}-${day}`;
 }
 
+function createRowElement(html) {
+  const template = document.createElement("template");
+  template.innerHTML = html.trim();
+  return template.content.firstElementChild;
+}
+
+function resetKeyedRows(tbody, html) {
+  tbody.innerHTML = html;
+  tbody.keyedRows = null;
+}
+
+function createSpacerRow(columns) {
+  const row = document.createElement("tr");
+  row.setAttribute("aria-hidden", "true");
+  row.innerHTML = `<td colspan="${columns}" style="padding: 0; border: 0;"></td>`;
+  return row;
+}
+
+// Render rows by key, replacing only rows whose signature changed. With a scroll
+// viewport, rows outside the visible window are swapped for spacer rows.
+function renderKeyedRows(tbody, items, options) {
+  const { getKey, getSignature, renderRow, viewport = null, rowHeight = 0, columns = 1 } = options;
+  if (!tbody.keyedRows) {
+    tbody.innerHTML = "";
+    tbody.keyedRows = new Map();
+    tbody.topSpacer = createSpacerRow(columns);
+    tbody.bottomSpacer = createSpacerRow(columns);
+    tbody.append(tbody.topSpacer, tbody.bottomSpacer);
+  }
+  const rows = tbody.keyedRows;
+  const measuredHeight = tbody.measuredRowHeight || rowHeight;
+
+  let start = 0;
+  let end = items.length;
+  if (viewport && measuredHeight && items.length > VIRTUAL_ROW_THRESHOLD) {
+    const bodyTop =
+      tbody.getBoundingClientRect().top - viewport.getBoundingClientRect().top + viewport.scrollTop;
+    const firstVisible = Math.floor(Math.max(0, viewport.scrollTop - bodyTop) / measuredHeight);
+    const visibleCount = Math.ceil(viewport.clientHeight / measuredHeight);
+    start = Math.max(0, Math.min(items.length, firstVisible) - VIRTUAL_OVERSCAN_ROWS);
+    end = Math.min(items.length, firstVisible + visibleCount + VIRTUAL_OVERSCAN_ROWS);
+  }
+
+  const seen = new Set();
+  let previous = tbody.topSpacer;
+  for (let index = start; index < end; index += 1) {
+    const item = items[index];
+    const key = String(getKey(item));
+    const signature = getSignature(item);
+    seen.add(key);
+
+    let entry = rows.get(key);
+    if (!entry || entry.signature !== signature) {
+      const element = createRowElement(renderRow(item));
+      if (entry) {
+        entry.element.replaceWith(element);
+      }
+      entry = { element, signature };
+      rows.set(key, entry);
+    }
+    if (previous.nextSibling !== entry.element) {
+      tbody.insertBefore(entry.element, previous.nextSibling);
+    }
+    previous = entry.element;
+  }
+
+  rows.forEach((entry, key) => {
+    if (!seen.has(key)) {
+      entry.element.remove();
+      rows.delete(key);
+    }
+  });
+
+  const topHeight = start * measuredHeight;
+  const bottomHeight = (items.length - end) * measuredHeight;
+  tbody.topSpacer.style.display = topHeight ? "" : "none";
+  tbody.topSpacer.firstChild.style.height = `${topHeight}px`;
+  tbody.bottomSpacer.style.display = bottomHeight ? "" : "none";
+  tbody.bottomSpacer.firstChild.style.height = `${bottomHeight}px`;
+
+  const sampleRow = tbody.topSpacer.nextSibling;
+  if (viewport && sampleRow && sampleRow !== tbody.bottomSpacer && sampleRow.offsetHeight) {
+    tbody.measuredRowHeight = sampleRow.offsetHeight;
+  }
+}
+
 function formatClock(totalMinutes) {
   const normalized = ((totalMinutes % (24 * 60)) + (24 * 60)) % (24 * 60);
   const hours = Math.floor(normalized / 60);
@@ -134,154 +199,6 @@ function formatWorkMinute(workMinuteOffset) {
   return { day, clock, label: `D${day} ${clock}` };
 }
 
-function getProcessRange(processName) {
-  return PROCESS_STAGE_MAP[processName] || null;
-}
-
-function getCompletedProcessList(order) {
-  if (!Array.isArray(order?.completed_processes)) {
-    return [];
-  }
-
-  const allowed = new Set(PROCESS_FLOW.map((process) => process.name));
-  return order.completed_processes.filter((name, index, array) => (
-    allowed.has(name) && array.indexOf(name) === index
-  ));
-}
-
-function getNextPendingProcess(order) {
-  const completedSet = new Set(getCompletedProcessList(order));
-  const next = PROCESS_FLOW.find((process) => !completedSet.has(process.name));
-  return next ? next.name : null;
-}
-
-function getCompletedStageProgress(order) {
-  const completedSet = new Set(getCompletedProcessList(order));
-  let progress = 0;
-  for (const process of PROCESS_FLOW) {
-    if (completedSet.has(process.name)) {
-      progress += process.ratio;
-    } else {
-      break;
-    }
-  }
-  return progress;
-}
-
-function getProgressSnapshot(order) {
-  if (isStatusCompleted(order)) {
-    return {
-      normalizedProgress: 100,
-      activeProcessPercent: 100,
-      nextProcessName: null,
-      completedProgress: 100,
-    };
-  }
-
-  const completedProgress = getCompletedStageProgress(order);
-  const nextProcessName = getNextPendingProcess(order);
-  const nextProcess = PROCESS_FLOW.find((process) => process.name === nextProcessName) || null;
-  if (!nextProcess) {
-    return {
-      normalizedProgress: 100,
-      activeProcessPercent: 100,
-      nextProcessName: null,
-      completedProgress: 100,
-    };
-  }
-
-  const dateProgress = calculateDateProgress(order);
-  const stageEnd = completedProgress + nextProcess.ratio;
-  const stageCap = stageEnd >= 100 ? 99 : stageEnd;
-  const projected = dateProgress === null ? completedProgress : dateProgress;
-  const normalizedProgress = Math.max(completedProgress, Math.min(stageCap, projected));
-
-  const ratio = nextProcess.ratio > 0 ? nextProcess.ratio : 1;
-  const activeProcessPercent = Math.max(
-    0,
-    Math.min(99, ((normalizedProgress - completedProgress) / ratio) * 100)
-  );
-
-  return {
-    normalizedProgress,
-    activeProcessPercent,
-    nextProcessName,
-    completedProgress,
-  };
-}
-
-function getActiveProcessProgress(order) {
-  return Math.round(getProgressSnapshot(order).activeProcessPercent);
-}
-
-function getProcessProgressPercent(orderProgress, processName) {
-  const stage = getProcessRange(processName);
-  if (!stage) {
-    return 0;
-  }
-
-  const progress = Number(orderProgress) || 0;
-  if (progress <= stage.start) {
-    return 0;
-  }
-  if (progress >= stage.end) {
-    return 100;
-  }
-
-  const span = stage.end - stage.start;
-  if (span <= 0) {
-    return 0;
-  }
-  return ((progress - stage.start) / span) * 100;
-}
-
-function isStatusCompleted(order) {
-  return String(order?.status || "").toLowerCase() === "completed";
-}
-
-function calculateDateProgress(order) {
-  const start = parseDate(order?.start_date);
-  const end = parseDate(order?.completion_date);
-  if (!start || !end) {
-    return null;
-  }
-
-  const referenceDate = parseDate(demoDateInput?.value) || parseDate(new Date());
-  const msPerDay = 1000 * 60 * 60 * 24;
-  const totalDays = Math.floor((end - start) / msPerDay);
-  const elapsedDays = Math.floor((referenceDate - start) / msPerDay);
-
-  if (elapsedDays >= totalDays) {
-    return 100;
-  }
-  if (elapsedDays <= 0) {
-    return 0;
-  }
-  if (totalDays <= 0) {
-    return 100;
-  }
-  return Math.min(100, (100 / totalDays) * elapsedDays);
-}
-
-function isCompleted(order) {
-  return isStatusCompleted(order) || getNormalizedProgress(order) >= 100;
-}
-
-function getNormalizedProgress(order) {
-  return getProgressSnapshot(order).normalizedProgress;
-}
-
-function getEffectivePriority(order) {
-  if (isCompleted(order)) {
-    return "LOW";
-  }
-  const priority = String(order.priority || "LOW").toUpperCase();
-  if (priority === "HIGH" || priority === "MEDIUM" || priority === "LOW") {
-    return priority;
-  }
-  return "LOW";
-}
-
 function readCachedOrders() {
   try {
     const raw = localStorage.getItem(LOCAL_ORDERS_CACHE_KEY);
@@ -304,14 +221,46 @@ function writeCachedOrders(orders) {
   }
 }
 
-function getOrderSignature(order) {
-  return [
-    String(order?.customer_name || "").trim().toLowerCase(),
-    String(order?.cabinet_type || "").trim().toLowerCase(),
-    String(order?.color || "").trim().toLowerCase(),
-    String(Number(order?.quantity) || 0),
-    String(order?.completion_date || ""),
-  ].join("|");
+function readSyncState() {
+  try {
+    const parsed = JSON.parse(localStorage.getItem(LOCAL_SYNC_STATE_KEY) || "{}");
+    return {
+      version: parsed?.version || null,
+      // Deletes are { id, signature } so the backend can tell if the ID was reused.
+      deletes: Array.isArray(parsed?.deletes) ? parsed.deletes.filter((item) => item && typeof item === "object") : [],
+    };
+  } catch (error) {
+    console.warn("Failed to read sync state:", error);
+    return { version: null, deletes: [] };
+  }
+}
+
+function writeSyncState(state) {
+  try {
+    localStorage.setItem(LOCAL_SYNC_STATE_KEY, JSON.stringify(state));
+  } catch (error) {
+    console.warn("Failed to write sync state:", error);
+  }
+}
+
+// Load the process flow from the backend, falling back to the last copy seen.
+async function loadProcessConfig() {
+  try {
+    const response = await fetch(`${BACKEND_URL}/routings`);
+    if (!response.ok) {
+      throw new Error(`Request failed with ${response.status}`);
+    }
+    processConfig = await response.json();
+    localStorage.setItem(LOCAL_PROCESS_CONFIG_KEY, JSON.stringify(processConfig));
+  } catch (error) {
+    console.warn("Failed to load process routings, using local copy:", error);
+    try {
+      processConfig = JSON.parse(localStorage.getItem(LOCAL_PROCESS_CONFIG_KEY) || "null");
+    } catch (_ignored) {
+      processConfig = null;
+    }
+  }
+  setProcessConfig(processConfig);
 }
 
 function findOrderById(orders, targetId) {
@@ -405,43 +354,56 @@ function renderAttendanceTable(records) {
   }
 
   if (!Array.isArray(records) || !records.length) {
-    attendanceTable.innerHTML = `
+    resetKeyedRows(attendanceTable, `
       <tr>
         <td colspan="5" class="p-6 text-center" style="color: #B6771D;">
           No absences recorded.
         </td>
       </tr>
-    `;
+    `);
     return;
   }
 
-  attendanceTable.innerHTML = records.map((record) => {
-    const id = Number(record.id) || 0;
-    const date = formatAttendanceDate(record.date);
-    const resource = String(record.resource || "").toUpperCase();
-    const role = String(record.role || "").trim() || "N/A";
-    const reason = String(record.reason || "").trim() || "-";
-    return `
-      <tr class="border-b border-amber-100">
-        <td class="p-4" style="color: #7B542F;">${date}</td>
-        <td class="p-4 font-semibold" style="color: #3f2a1c;">${resource}</td>
-        <td class="p-4" style="color: #7B542F;">${role}</td>
-        <td class="p-4" style="color: #7B542F;">${reason}</td>
-        <td class="p-4 no-print">
-          <button
-            type="button"
-            onclick="deleteAttendanceRecord(${id})"
-            class="px-3 py-1 rounded-lg text-white text-xs font-semibold"
-            style="background: #7B542F;"
-            onmouseover="this.style.background='#B6771D'"
-            onmouseout="this.style.background='#7B542F'"
-          >
-            Remove
-          </button>
-        </td>
-      </tr>
-    `;
-  }).join("");
+  renderKeyedRows(attendanceTable, records, {
+    getKey: (record) => Number(record.id) || 0,
+    getSignature: getAttendanceRowSignature,
+    renderRow: renderAttendanceRow,
+    viewport: attendanceViewport,
+    rowHeight: ATTENDANCE_ROW_HEIGHT,
+    columns: 5,
+  });
+}
+
+function getAttendanceRowSignature(record) {
+  return [record.id, record.date, record.resource, record.role, record.reason].join("|");
+}
+
+function renderAttendanceRow(record) {
+  const id = Number(record.id) || 0;
+  const date = formatAttendanceDate(record.date);
+  const resource = String(record.resource || "").toUpperCase();
+  const role = String(record.role || "").trim() || "N/A";
+  const reason = String(record.reason || "").trim() || "-";
+  return `
+    <tr class="border-b border-amber-100">
+      <td class="p-4" style="color: #7B542F;">${date}</td>
+      <td class="p-4 font-semibold" style="color: #3f2a1c;">${resource}</td>
+      <td class="p-4" style="color: #7B542F;">${role}</td>
+      <td class="p-4" style="color: #7B542F;">${reason}</td>
+      <td class="p-4 no-print">
+        <button
+          type="button"
+          onclick="deleteAttendanceRecord(${id})"
+          class="px-3 py-1 rounded-lg text-white text-xs font-semibold"
+          style="background: #7B542F;"
+          onmouseover="this.style.background='#B6771D'"
+          onmouseout="this.style.background='#7B542F'"
+        >
+          Remove
+        </button>
+      </td>
+    </tr>
+  `;
 }
 
 async function loadAttendance() {
@@ -466,13 +428,13 @@ async function loadAttendance() {
     console.error("Failed to load attendance:", error);
     renderAttendanceTable(globalAttendance);
     if (!globalAttendance.length) {
-      attendanceTable.innerHTML = `
+      resetKeyedRows(attendanceTable, `
         <tr>
           <td colspan="5" class="p-6 text-center" style="color: #B6771D;">
             Failed to load attendance. Check backend connection.
           </td>
         </tr>
-      `;
+      `);
     }
   }
 }
@@ -496,122 +458,57 @@ async function deleteAttendanceRecord(recordId) {
 
 window.deleteAttendanceRecord = deleteAttendanceRecord;
 
-function getReconcileActions(backendOrders, cachedOrders) {
-  const cacheBuckets = new Map();
+function applySyncDiff(cachedOrders, diff) {
+  const idMap = diff.id_map || {};
+  const deletedIds = new Set((diff.deletes || []).map(Number));
+  const byId = new Map();
   cachedOrders.forEach((order) => {
-    const signature = getOrderSignature(order);
-    if (!cacheBuckets.has(signature)) {
-      cacheBuckets.set(signature, []);
-    }
-    cacheBuckets.get(signature).push(order);
-  });
-
-  const deleteIds = [];
-  backendOrders.forEach((order) => {
-    const signature = getOrderSignature(order);
-    const bucket = cacheBuckets.get(signature);
-    if (bucket && bucket.length) {
-      bucket.shift();
+    const id = Number(order.id);
+    if (deletedIds.has(id) || idMap[id] !== undefined) {
       return;
     }
-    deleteIds.push(order.id);
-  });
-
-  const createOrders = [];
-  cacheBuckets.forEach((bucket) => {
-    bucket.forEach((order) => createOrders.push(order));
+    byId.set(id, order);
   });
-
-  return { deleteIds, createOrders };
-}
-
-function mergeOrderIntoCache(order) {
-  const cached = readCachedOrders();
-  const signature = getOrderSignature(order);
-  const exists = cached.some((item) => getOrderSignature(item) === signature);
-  if (!exists) {
-    writeCachedOrders([...cached, order]);
-  }
-}
-
-async function restoreOrdersFromCache(cachedOrders) {
-  if (isRestoringFromCache || !cachedOrders.length) {
-    return false;
-  }
-
-  isRestoringFromCache = true;
-  try {
-    for (const cached of cachedOrders) {
-      const payload = {
-        customer_name: cached.customer_name,
-        cabinet_type: cached.cabinet_type,
-        color: cached.color,
-        quantity: Number(cached.quantity) || 1,
-        start_date: cached.start_date || getLocalDateISO(),
-        completion_date: cached.completion_date,
-        completed_processes: Array.isArray(cached.completed_processes) ? cached.completed_processes : [],
-        active_process_progress: Number(cached.active_process_progress) || 0,
-      };
-
-      const response = await fetch(`${BACKEND_URL}/orders`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify(payload),
-      });
-
-      if (!response.ok) {
-        throw new Error(`Restore failed with status ${response.status}`);
-      }
-    }
-    return true;
-  } catch (error) {
-    console.error("Failed to restore cached orders to backend:", error);
-    return false;
-  } finally {
-    isRestoringFromCache = false;
-  }
+  (diff.upserts || []).forEach((order) => byId.set(Number(order.id), order));
+  return Array.from(byId.values());
 }
 
-async function reconcileBackendWithCache(backendOrders, cachedOrders) {
-  if (isReconcilingFromCache || !cachedOrders.length) {
+// Reconcile the local backup with the backend in one request. The server restores
+// orders it lost under their original IDs and returns only what changed.
+async function syncWithBackend() {
+  if (isSyncingWithBackend || demoDateInput?.value) {
     return false;
   }
 
-  const { deleteIds, createOrders } = getReconcileActions(backendOrders, cachedOrders);
-  if (!deleteIds.length && !createOrders.length) {
-    return false;
-  }
-
-  isReconcilingFromCache = true;
+  isSyncingWithBackend = true;
   try {
-    for (const id of deleteIds) {
-      await fetch(`${BACKEND_URL}/orders/${id}`, { method: "DELETE" });
-    }
-
-    for (const cached of createOrders) {
-      const payload = {
-        customer_name: cached.customer_name,
-        cabinet_type: cached.cabinet_type,
-        color: cached.color,
-        quantity: Number(cached.quantity) || 1,
-        start_date: cached.start_date || getLocalDateISO(),
-        completion_date: cached.completion_date,
-        completed_processes: Array.isArray(cached.completed_processes) ? cached.completed_processes : [],
-        active_process_progress: Number(cached.active_process_progress) || 0,
-      };
-      await fetch(`${BACKEND_URL}/orders`, {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify(payload),
-      });
+    const state = readSyncState();
+    const response = await fetch(`${BACKEND_URL}/sync`, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({
+        version: state.version,
+        orders: readCachedOrders(),
+        deletes: state.deletes,
+      }),
+    });
+    if (!response.ok) {
+      throw new Error(`Sync failed with ${response.status}`);
     }
 
+    const diff = await response.json();
+    (diff.rejected || []).forEach((item) => {
+      console.warn(`Order ${item.id} could not be restored: ${item.error}`);
+    });
+    writeCachedOrders(applySyncDiff(readCachedOrders(), diff));
+    writeSyncState({ version: diff.version, deletes: [] });
+    needsBackendSync = false;
     return true;
   } catch (error) {
-    console.error("Failed to reconcile backend with local cache:", error);
+    console.error("Failed to sync with backend:", error);
     return false;
   } finally {
-    isReconcilingFromCache = false;
+    isSyncingWithBackend = false;
   }
 }
 
@@ -640,13 +537,6 @@ function renderBreakdown(container, rows) {
     .join("");
 }
 
-function getUpcomingDeadlineOrders(orders) {
-  return [...orders]
-    .filter((order) => !isCompleted(order))
-    .filter((order) => parseDate(order.completion_date))
-    .sort((a, b) => parseDate(a.completion_date) - parseDate(b.completion_date));
-}
-
 function updateDeadlinesPagination(totalItems) {
   if (!deadlinesPrevBtn || !deadlinesNextBtn || !deadlinesPageInfo) {
     return;
@@ -665,12 +555,11 @@ function updateDeadlinesPagination(totalItems) {
   deadlinesPageInfo.textContent = `Page ${deadlinesPage} of ${totalPages}`;
 }
 
-function renderUpcomingDeadlines(orders) {
+function renderUpcomingDeadlines(dueOrders) {
   if (!upcomingDeadlines) {
     return;
   }
 
-  const dueOrders = getUpcomingDeadlineOrders(orders);
   if (!dueOrders.length) {
     upcomingDeadlines.innerHTML = '<p class="text-sm" style="color: #B6771D;">No upcoming active orders.</p>';
     updateDeadlinesPagination(0);
@@ -708,7 +597,7 @@ function renderUpcomingDeadlines(orders) {
   updateDeadlinesPagination(dueOrders.length);
 }
 
-function renderMachineUtilization(orders) {
+function renderMachineUtilization(orders, stageUtilizations = null) {
   if (!machineUtilizationList) {
     return;
   }
@@ -719,8 +608,8 @@ function renderMachineUtilization(orders) {
     return;
   }
 
-  const stageUtilizations = calculateStageUtilizations(orders);
-  machineUtilizationList.innerHTML = stageUtilizations.map((stage) => {
+  const stages = stageUtilizations || calculateStageUtilizations(orders);
+  machineUtilizationList.innerHTML = stages.map((stage) => {
     const clampedUtilization = Math.max(0, Math.min(100, stage.utilization));
 
     return `
@@ -734,80 +623,48 @@ function renderMachineUtilization(orders) {
   }).join("");
 }
 
-function calculateStageUtilizations(orders) {
-  const totalWeight = orders.reduce(
-    (sum, order) => sum + (Number(order.quantity) || 1),
-    0
-  );
-  const safeWeight = totalWeight || 1;
-
-  const getStageProgressForOrder = (order, processName) => {
-    if (isStatusCompleted(order)) {
-      return 100;
-    }
+function computeDashboardLocally(orders) {
+  setProgressReferenceDate(demoDateInput?.value);
+  return computeDashboardModel(orders);
+}
 
-    const completedSet = new Set(getCompletedProcessList(order));
-    if (completedSet.has(processName)) {
-      return 100;
-    }
+function startDashboardWorker() {
+  try {
+    dashboardWorker = new Worker("dashboard-worker.js");
+  } catch (error) {
+    // Workers are unavailable on file:// in some browsers.
+    console.warn("Dashboard worker unavailable, computing on the main thread:", error);
+    dashboardWorker = null;
+    return;
+  }
 
-    const nextProcessName = getNextPendingProcess(order);
-    if (nextProcessName === processName) {
-      return getActiveProcessProgress(order);
+  dashboardWorker.addEventListener("message", (event) => {
+    const { requestId, model } = event.data || {};
+    const pending = dashboardRequests.get(requestId);
+    if (pending) {
+      dashboardRequests.delete(requestId);
+      pending.resolve(model);
     }
-
-    return 0;
-  };
-
-  return PROCESS_FLOW.map((process) => {
-    const weightedProgress = orders.reduce((sum, order) => {
-      const weight = Number(order.quantity) || 1;
-      const processProgress = getStageProgressForOrder(order, process.name);
-      return sum + processProgress * weight;
-    }, 0);
-
-    const utilization = Math.round(weightedProgress / safeWeight);
-    return {
-      name: process.name,
-      utilization: Math.max(0, Math.min(100, utilization)),
-    };
+  });
+  dashboardWorker.addEventListener("error", (event) => {
+    console.warn("Dashboard worker failed, computing on the main thread:", event.message);
+    dashboardWorker = null;
+    dashboardRequests.forEach((pending) => pending.resolve(computeDashboardLocally(pending.orders)));
+    dashboardRequests.clear();
   });
 }
 
-function calculateStageRemainingLoads(orders) {
-  const stageLoads = PROCESS_FLOW.map((process) => ({
-    name: process.name,
-    load: 0,
-  }));
-
-  orders.forEach((order) => {
-    const weight = Number(order.quantity) || 1;
-    const progress = getNormalizedProgress(order);
-
-    PROCESS_FLOW.forEach((process, index) => {
-      const stage = getProcessRange(process.name);
-      if (!stage) {
-        return;
-      }
-
-      let remainingPercent = 0;
-      if (progress <= stage.start) {
-        remainingPercent = process.ratio;
-      } else if (progress >= stage.end) {
-        remainingPercent = 0;
-      } else {
-        remainingPercent = stage.end - progress;
-      }
+function requestDashboardModel(orders) {
+  dashboardRequestId += 1;
+  const requestId = dashboardRequestId;
+  if (!dashboardWorker) {
+    return Promise.resolve({ requestId, model: computeDashboardLocally(orders) });
+  }
 
-      stageLoads[index].load += remainingPercent * weight;
-    });
+  return new Promise((resolve) => {
+    dashboardRequests.set(requestId, { orders, resolve: (model) => resolve({ requestId, model }) });
+    dashboardWorker.postMessage({ requestId, orders, referenceDate: demoDateInput?.value || "", processConfig });
   });
-
-  const totalLoad = stageLoads.reduce((sum, stage) => sum + stage.load, 0) || 1;
-  return stageLoads.map((stage) => ({
-    ...stage,
-    share: Math.round((stage.load / totalLoad) * 100),
-  }));
 }
 
 function renderDashboard(orders) {
@@ -815,92 +672,35 @@ function renderDashboard(orders) {
     return;
   }
 
-  const today = new Date();
-  today.setHours(0, 0, 0, 0);
-  const msPerDay = 1000 * 60 * 60 * 24;
-
-  const totalOrders = orders.length;
-  const completedOrders = orders.filter(isCompleted).length;
-  const activeOrders = totalOrders - completedOrders;
-
-  const dueSoon = orders.filter((order) => {
-    if (isCompleted(order)) {
-      return false;
-    }
-    const endDate = parseDate(order.completion_date);
-    if (!endDate) {
-      return false;
+  requestDashboardModel(orders).then(({ requestId, model }) => {
+    // A newer poll has already been sent; drop this stale result.
+    if (requestId !== dashboardRequestId) {
+      return;
     }
-    const daysUntilDue = Math.floor((endDate - today) / msPerDay);
-    return daysUntilDue >= 0 && daysUntilDue <= 7;
-  }).length;
-
-  const activeOrdersOnly = orders.filter((order) => !isCompleted(order));
-  const totalUnits = orders.reduce((sum, order) => sum + (Number(order.quantity) || 0), 0);
-  const wipUnits = activeOrdersOnly.reduce((sum, order) => sum + (Number(order.quantity) || 0), 0);
-
-  statTotalOrders.textContent = String(totalOrders);
-  statActiveOrders.textContent = String(activeOrders);
-  statCompletedOrders.textContent = String(completedOrders);
-  statDueSoon.textContent = String(dueSoon);
-  statTotalUnits.textContent = String(totalUnits);
+    applyDashboardModel(orders, model);
+  });
+}
+
+function applyDashboardModel(orders, model) {
+  const { stats } = model;
+  statTotalOrders.textContent = String(stats.totalOrders);
+  statActiveOrders.textContent = String(stats.activeOrders);
+  statCompletedOrders.textContent = String(stats.completedOrders);
+  statDueSoon.textContent = String(stats.dueSoon);
+  statTotalUnits.textContent = String(stats.totalUnits);
   if (statPendingUnits) {
-    statPendingUnits.textContent = String(wipUnits);
+    statPendingUnits.textContent = String(stats.wipUnits);
   }
 
-  const activePriorityOrders = activeOrdersOnly;
-  const priorityCounts = { HIGH: 0, MEDIUM: 0, LOW: 0 };
-
-  activePriorityOrders.forEach((order) => {
-    const priority = getEffectivePriority(order);
-    if (priorityCounts[priority] !== undefined) {
-      priorityCounts[priority] += 1;
-    } else {
-      priorityCounts.LOW += 1;
-    }
-  });
-
-  const priorityTotal = activePriorityOrders.length || 1;
-  renderBreakdown(priorityBreakdown, [
-    {
-      label: "High",
-      count: priorityCounts.HIGH,
-      percent: Math.round((priorityCounts.HIGH / priorityTotal) * 100),
-      color: "#FF9D00",
-    },
-    {
-      label: "Medium",
-      count: priorityCounts.MEDIUM,
-      percent: Math.round((priorityCounts.MEDIUM / priorityTotal) * 100),
-      color: "#B6771D",
-    },
-    {
-      label: "Low",
-      count: priorityCounts.LOW,
-      percent: Math.round((priorityCounts.LOW / priorityTotal) * 100),
-      color: "#7B542F",
-    },
-  ]);
-
-  const typeCounts = {};
-  orders.forEach((order) => {
-    const type = order.cabinet_type || "Unspecified";
-    typeCounts[type] = (typeCounts[type] || 0) + 1;
-  });
+  renderBreakdown(priorityBreakdown, model.priorityRows);
+  renderBreakdown(cabinetBreakdown, model.typeRows);
+  globalDeadlineOrders = model.upcomingDeadlines;
+  renderUpcomingDeadlines(globalDeadlineOrders);
 
-  const typeTotal = totalOrders || 1;
-  const palette = ["#7B542F", "#B6771D", "#FF9D00", "#9c8064"];
-  const typeRows = Object.entries(typeCounts)
-    .sort((a, b) => b[1] - a[1])
-    .map(([label, count], index) => ({
-      label,
-      count,
-      percent: Math.round((count / typeTotal) * 100),
-      color: palette[index % palette.length],
-    }));
-
-  renderBreakdown(cabinetBreakdown, typeRows);
-  renderUpcomingDeadlines(orders);
+  if (machineUtilizationSection && !machineUtilizationSection.classList.contains("hidden")
+      && !findOrderById(orders, activeProjectOrderId)) {
+    renderMachineUtilization(orders, model.stageUtilizations);
+  }
 }
 
 function updateOrdersPagination(totalItems) {
@@ -1000,14 +800,27 @@ function renderOrderRow(order) {
   `;
 }
 
+function getOrderRowSignature(order) {
+  return [
+    order.id,
+    getOrderSignature(order),
+    order.start_date,
+    order.status,
+    getEffectivePriority(order),
+    getNormalizedProgress(order).toFixed(2),
+  ].join("|");
+}
+
 function renderOrdersTable(orders) {
   if (!ordersTable) {
     return;
   }
 
   if (!orders.length) {
-    ordersTable.innerHTML =
-      '<tr><td colspan="12" class="p-4 text-center" style="color: #B6771D;">No orders yet. Add one above.</td></tr>';
+    resetKeyedRows(
+      ordersTable,
+      '<tr><td colspan="12" class="p-4 text-center" style="color: #B6771D;">No orders yet. Add one above.</td></tr>'
+    );
     updateOrdersPagination(0);
     return;
   }
@@ -1017,7 +830,12 @@ function renderOrdersTable(orders) {
   const start = (ordersTablePage - 1) * ORDERS_PAGE_SIZE;
   const pageItems = orders.slice(start, start + ORDERS_PAGE_SIZE);
 
-  ordersTable.innerHTML = pageItems.map((order) => renderOrderRow(order)).join("");
+  renderKeyedRows(ordersTable, pageItems, {
+    getKey: (order) => order.id,
+    getSignature: getOrderRowSignature,
+    renderRow: renderOrderRow,
+    columns: 12,
+  });
   updateOrdersPagination(orders.length);
 }
 
@@ -1026,11 +844,14 @@ async function loadOrders() {
     return;
   }
 
-  const cachedOrders = readCachedOrders();
+  setProgressReferenceDate(demoDateInput?.value);
 
   try {
     const demoDate = demoDateInput?.value;
     const query = demoDate ? `?date=${demoDate}` : "";
+    if (needsBackendSync && !demoDate) {
+      await syncWithBackend();
+    }
 
     const response = await fetch(`${BACKEND_URL}/orders${query}`);
     if (!response.ok) {
@@ -1042,36 +863,44 @@ async function loadOrders() {
     const machineSchedule = data.machine_schedule || {};
     const assignments = data.assignments || [];
 
-    // Backend is the source of truth. Do not mutate backend from local browser cache.
+    // Backend is the source of truth. Local changes only reach it through /sync.
 
     globalMachineSchedule = machineSchedule;
     globalAssignments = assignments;
     globalOrders = orders;
-    if (!demoDate) {
+    if (!demoDate && !needsBackendSync) {
       writeCachedOrders(orders);
+      writeSyncState({ ...readSyncState(), version: data.version || null });
     }
 
     renderDashboard(orders);
     if (machineUtilizationSection && !machineUtilizationSection.classList.contains("hidden")) {
       const selectedOrder = findOrderById(orders, activeProjectOrderId);
-      renderMachineUtilization(selectedOrder ? [selectedOrder] : orders);
+      if (selectedOrder) {
+        renderMachineUtilization([selectedOrder]);
+      }
     }
     renderOrdersTable(orders);
     refreshActiveProjectView();
   } catch (error) {
     console.error("Failed to load orders:", error);
-    const fallbackOrders = cachedOrders;
+    needsBackendSync = true;
+    const fallbackOrders = readCachedOrders();
     globalOrders = fallbackOrders;
     renderDashboard(fallbackOrders);
     if (machineUtilizationSection && !machineUtilizationSection.classList.contains("hidden")) {
       const selectedOrder = findOrderById(fallbackOrders, activeProjectOrderId);
-      renderMachineUtilization(selectedOrder ? [selectedOrder] : fallbackOrders);
+      if (selectedOrder) {
+        renderMachineUtilization([selectedOrder]);
+      }
     }
     renderOrdersTable(fallbackOrders);
     refreshActiveProjectView();
     if (!fallbackOrders.length) {
-      ordersTable.innerHTML =
-        '<tr><td colspan="12" class="p-4 text-center" style="color: #B6771D;">Failed to load orders. Check backend connection.</td></tr>';
+      resetKeyedRows(
+        ordersTable,
+        '<tr><td colspan="12" class="p-4 text-center" style="color: #B6771D;">Failed to load orders. Check backend connection.</td></tr>'
+      );
     }
   }
 }
@@ -1109,10 +938,6 @@ if (orderForm) {
       });
 
       if (response.ok) {
-        const createdOrder = await response.json().catch(() => null);
-        if (createdOrder && !demoDate) {
-          mergeOrderIntoCache(createdOrder);
-        }
         orderForm.reset();
         updateCompletionDateMin();
         loadOrders();
@@ -1187,7 +1012,18 @@ async function deleteOrder(id) {
       }
       loadOrders();
     } catch (error) {
-      const nextOrders = readCachedOrders().filter((o) => Number(o.id) !== Number(id));
+      // Queue the delete so the next sync applies it on the backend.
+      const cached = readCachedOrders();
+      const deleted = findOrderById(cached, id);
+      const state = readSyncState();
+      if (deleted && !state.deletes.some((item) => Number(item.id) === Number(id))) {
+        writeSyncState({
+          ...state,
+          deletes: [...state.deletes, { id: Number(id), signature: getOrderSignature(deleted) }],
+        });
+      }
+      needsBackendSync = true;
+      const nextOrders = cached.filter((o) => Number(o.id) !== Number(id));
       writeCachedOrders(nextOrders);
       globalOrders = nextOrders;
       renderDashboard(nextOrders);
@@ -1283,23 +1119,26 @@ function openProjectView(orderId, options = {}) {
   ).join("");
   timelineWeekLabels.innerHTML = `<div style="display: grid; grid-template-columns: repeat(${totalDays}, 1fr); width: 100%; gap: 0;">${dayLabels}</div>`;
 
+  // Only the processes in this cabinet type's routing, scaled to fill the timeline.
+  const processFlow = getOrderProcessFlow(order);
+  const totalRatio = processFlow.reduce((sum, process) => sum + process.ratio, 0) || 100;
   const totalWorkMinutes = totalDays * WORKDAY_MINUTES;
   let allocatedMinutes = 0;
-  const processDurations = PROCESS_FLOW.map((process, idx) => {
-    if (idx === PROCESS_FLOW.length - 1) {
+  const processDurations = processFlow.map((process, idx) => {
+    if (idx === processFlow.length - 1) {
       return Math.max(0, totalWorkMinutes - allocatedMinutes);
     }
-    const minutes = Math.round((totalWorkMinutes * process.ratio) / 100);
+    const minutes = Math.round((totalWorkMinutes * process.ratio) / totalRatio);
     allocatedMinutes += minutes;
     return minutes;
   });
 
   let cumulativePercent = 0;
-  const productionRows = PROCESS_FLOW
+  const productionRows = processFlow
     .map((step) => {
       const offsetPercent = Math.min(100, cumulativePercent);
-      let widthPercent = step.ratio;
-      if (step === PROCESS_FLOW[PROCESS_FLOW.length - 1]) {
+      let widthPercent = (step.ratio * 100) / totalRatio;
+      if (step === processFlow[processFlow.length - 1]) {
         widthPercent = Math.max(0, 100 - cumulativePercent);
       }
       widthPercent = Math.min(100 - offsetPercent, widthPercent);
@@ -1323,7 +1162,7 @@ function openProjectView(orderId, options = {}) {
   const assignmentMap = new Map(
     rawAssignments.map((assignment) => [assignment.process, assignment])
   );
-  const orderAssignments = PROCESS_FLOW.map((process) => {
+  const orderAssignments = processFlow.map((process) => {
     const existing = assignmentMap.get(process.name);
     if (existing) {
       return existing;
@@ -1445,18 +1284,18 @@ if (deadlinesPrevBtn) {
   deadlinesPrevBtn.addEventListener("click", () => {
     if (deadlinesPage > 1) {
       deadlinesPage -= 1;
-      renderUpcomingDeadlines(globalOrders);
+      renderUpcomingDeadlines(globalDeadlineOrders);
     }
   });
 }
 
 if (deadlinesNextBtn) {
   deadlinesNextBtn.addEventListener("click", () => {
-    const totalItems = getUpcomingDeadlineOrders(globalOrders).length;
+    const totalItems = globalDeadlineOrders.length;
     const totalPages = Math.max(1, Math.ceil(totalItems / DEADLINES_PAGE_SIZE));
     if (deadlinesPage < totalPages) {
       deadlinesPage += 1;
-      renderUpcomingDeadlines(globalOrders);
+      renderUpcomingDeadlines(globalDeadlineOrders);
     }
   });
 }
@@ -1480,9 +1319,29 @@ if (ordersNextBtn) {
   });
 }
 
-loadOrders();
+startDashboardWorker();
+window.addEventListener("online", () => {
+  needsBackendSync = true;
+  loadOrders();
+});
+loadProcessConfig().then(() => {
+  loadOrders();
+  setInterval(loadOrders, 5000);
+});
 loadAttendance();
-setInterval(loadOrders, 5000);
+
+if (attendanceViewport) {
+  let attendanceScrollFrame = null;
+  attendanceViewport.addEventListener("scroll", () => {
+    if (attendanceScrollFrame !== null || !attendanceTable?.keyedRows) {
+      return;
+    }
+    attendanceScrollFrame = requestAnimationFrame(() => {
+      attendanceScrollFrame = null;
+      renderAttendanceTable(globalAttendance);
+    });
+  });
+}
 
 if (ordersTable) {
   ordersTable.addEventListener("click", (event) => {